@@ -3,15 +3,26 @@ tests to run and debug your minimax and alphabeta agents locally.  The test
 cases used by the project assistant are not public.
 """
 
+import json
+import os
+import random
+import tempfile
+import timeit
 import unittest
 
 import isolation
 import game_agent
+import search_trace
+
+try:
+    import batch_eval
+except ImportError:
+    batch_eval = None
 
 from importlib import reload
 
 from isolation import Board
-from sample_players import RandomPlayer, GreedyPlayer
+from sample_players import RandomPlayer, GreedyPlayer, improved_score
 
 
 class IsolationTest(unittest.TestCase):
@@ -107,5 +118,746 @@ class IsolationTest(unittest.TestCase):
         print(game.to_string())
         print("Move history:\n{!s}".format(history))
 
+
+class BitBoardTest(unittest.TestCase):
+    """Unit tests for the bitboard engine"""
+
+    def setUp(self):
+        self.player1 = "Player1"
+        self.player2 = "Player2"
+
+    def test_matches_board(self):
+        for width, height in [(7, 7), (5, 8)]:
+            game = isolation.Board(self.player1, self.player2, width, height)
+            bit_game = isolation.BitBoard(self.player1, self.player2, width, height)
+            while True:
+                moves = game.get_legal_moves()
+                self.assertEqual(sorted(moves), sorted(bit_game.get_legal_moves()))
+                self.assertEqual(game.to_string(), bit_game.to_string())
+                self.assertEqual(game._board_state, bit_game._board_state)
+                for player in (self.player1, self.player2):
+                    self.assertEqual(game.utility(player), bit_game.utility(player))
+                    self.assertEqual(game.get_player_location(player),
+                                     bit_game.get_player_location(player))
+                if not moves:
+                    break
+                move = random.choice(moves)
+                game.apply_move(move)
+                bit_game = bit_game.forecast_move(move)
+
+    def test_from_board(self):
+        game = isolation.Board(self.player1, self.player2)
+        game.apply_move((2, 3))
+        game.apply_move((0, 5))
+        bit_game = isolation.BitBoard.from_board(game)
+        self.assertEqual(game._board_state, bit_game._board_state)
+        self.assertEqual(sorted(game.get_legal_moves()),
+                         sorted(bit_game.get_legal_moves()))
+
+    def test_alphabeta_play_game(self):
+        player1 = game_agent.AlphaBetaPlayer()
+        player2 = game_agent.AlphaBetaPlayer()
+        game = isolation.BitBoard(player1, player2)
+        game.apply_move((2, 3))
+        game.apply_move((0, 5))
+        winner, history, outcome = game.play()
+        self.assertIn(winner, (player1, player2))
+        self.assertNotEqual(outcome, "timeout")
+
+
+class GeometryTest(unittest.TestCase):
+    """Unit tests for the precomputed board geometry"""
+
+    def test_geometry(self):
+        width, height = 5, 4
+        geometry = isolation.board_geometry(width, height)
+        self.assertIs(geometry, isolation.Board("Player1", "Player2", width, height).geometry)
+        self.assertIs(geometry, isolation.BitBoard("Player1", "Player2", width, height).geometry)
+        self.assertEqual({(0, 0), (0, 4), (3, 0), (3, 4)}, set(geometry.corners))
+
+        for idx, (r, c) in enumerate(geometry.coords):
+            self.assertEqual(idx, geometry.indices[(r, c)])
+            knight_moves = [(r + dr, c + dc) for dr, dc in isolation.geometry.DIRECTIONS
+                            if 0 <= r + dr < height and 0 <= c + dc < width]
+            self.assertEqual(knight_moves, [move for _, move in geometry.neighbours[idx]])
+            self.assertEqual(sum(1 << geometry.indices[move] for move in knight_moves),
+                             geometry.knight_masks[idx])
+            self.assertEqual((r, c) in geometry.corners, geometry.is_corner[idx])
+            self.assertEqual((2. - r) ** 2 + (2.5 - c) ** 2, geometry.center_distances[idx])
+
+
+class MakeUnmakeTest(unittest.TestCase):
+    """Unit tests for in-place push_move/pop_move search"""
+
+    def setUp(self):
+        reload(game_agent)
+        self.player1 = "Player1"
+        self.player2 = "Player2"
+
+    def test_push_pop_restores_state(self):
+        for board_class in (isolation.Board, isolation.BitBoard):
+            game = board_class(self.player1, self.player2)
+            states = []
+            while game.get_legal_moves():
+                states.append((game._board_state, game.to_string(),
+                               game.active_player, game.move_count))
+                game.push_move(random.choice(game.get_legal_moves()))
+            while states:
+                game.pop_move()
+                self.assertEqual(states.pop(), (game._board_state, game.to_string(),
+                                                game.active_player, game.move_count))
+
+    def test_in_place_search_matches_forecast(self):
+        for player_class, search in ((game_agent.MinimaxPlayer, "minimax"),
+                                     (game_agent.AlphaBetaPlayer, "alphabeta")):
+            results = []
+            for in_place in (False, True):
+                player = player_class(score_fn=improved_score, in_place=in_place)
+                player.time_left = lambda: 1000.
+                game = isolation.BitBoard(player, self.player2)
+                game.apply_move((2, 3))
+                game.apply_move((0, 5))
+                state = game._board_state
+                results.append(getattr(player, search)(game, 4))
+                self.assertEqual(state, game._board_state)
+            self.assertEqual(results[0], results[1])
+
+
+class MobilityTest(unittest.TestCase):
+    """Unit tests for the incremental mobility counts of the boards"""
+
+    def test_mobility(self):
+        rng = random.Random(0)
+        for board_class in (isolation.Board, isolation.BitBoard):
+            for _ in range(10):
+                game = board_class("Player1", "Player2", 6, 5)
+                pushed = 0
+                while True:
+                    for player in ("Player1", "Player2"):
+                        self.assertEqual(len(game.get_legal_moves(player)),
+                                         game.mobility(player))
+                    copy = board_class.from_snapshot(game.snapshot(), "Player1", "Player2")
+                    self.assertEqual(game.mobility("Player2"), copy.mobility("Player2"))
+
+                    moves = game.get_legal_moves()
+                    if not moves:
+                        break
+                    if rng.random() < 0.5:
+                        game.push_move(rng.choice(moves))
+                        pushed += 1
+                    elif pushed and rng.random() < 0.3:
+                        game.pop_move()
+                        pushed -= 1
+                    else:
+                        game = game.forecast_move(rng.choice(moves))
+                        pushed = 0
+
+
+class ZobristTest(unittest.TestCase):
+    """Unit tests for incremental Zobrist keys"""
+
+    def setUp(self):
+        self.player1 = "Player1"
+        self.player2 = "Player2"
+
+    def test_transpositions_share_key(self):
+        # player 1 walks the 4-cycle (2, 2)-(0, 3)-(2, 4)-(4, 3) in two orders
+        p1_paths = [[(2, 2), (0, 3), (2, 4), (4, 3)],
+                    [(2, 4), (0, 3), (2, 2), (4, 3)]]
+        p2_path = [(6, 6), (4, 5), (6, 4)]
+        for board_class in (isolation.Board, isolation.BitBoard):
+            games = []
+            for p1_path in p1_paths:
+                game = board_class(self.player1, self.player2)
+                for p1_move, p2_move in zip(p1_path, p2_path + [None]):
+                    game.apply_move(p1_move)
+                    if p2_move:
+                        game.apply_move(p2_move)
+                games.append(game)
+            self.assertEqual(games[0]._board_state, games[1]._board_state)
+            self.assertEqual(games[0].zobrist_key, games[1].zobrist_key)
+            self.assertNotEqual(games[0].zobrist_key,
+                                games[0].forecast_move((5, 6)).zobrist_key)
+
+    def test_key_matches_board_state(self):
+        for board_class in (isolation.Board, isolation.BitBoard):
+            game = board_class(self.player1, self.player2)
+            keys = {}
+            while game.get_legal_moves():
+                game.push_move(random.choice(game.get_legal_moves()))
+                state = tuple(game._board_state)
+                self.assertEqual(keys.setdefault(state, game.zobrist_key), game.zobrist_key)
+                self.assertEqual(game.hash(), game.zobrist_key)
+            while game.move_count:
+                game.pop_move()
+                self.assertEqual(keys.get(tuple(game._board_state), 0), game.zobrist_key)
+            self.assertEqual(0, game.zobrist_key)
+
+
+class CachedScoreTest(unittest.TestCase):
+    """Unit tests for the evaluation cache"""
+
+    def setUp(self):
+        reload(game_agent)
+
+    def test_cached_score(self):
+        calls = []
+
+        def score_fn(game, player):
+            calls.append(game.get_player_location(player))
+            return improved_score(game, player)
+
+        score = game_agent.CachedScore(score_fn, max_entries=2)
+        game = isolation.Board("Player1", "Player2")
+        game.apply_move((2, 3))
+        game.apply_move((0, 5))
+        for player in ("Player1", "Player2", "Player1"):
+            self.assertEqual(improved_score(game, player), score(game, player))
+        self.assertEqual([(2, 3), (0, 5)], calls)
+        self.assertEqual((3, 1), (score.lookups, score.hits))
+
+        # the same position reached in another game is answered from the cache
+        other = isolation.Board("Player1", "Player2")
+        other.apply_move((2, 3))
+        other.apply_move((0, 5))
+        score(other, "Player2")
+        self.assertEqual(2, len(calls))
+
+        # the least recently used entry (Player1) is evicted
+        score(game.forecast_move((4, 4)), "Player1")
+        score(game, "Player1")
+        self.assertEqual(4, len(calls))
+
+        score.clear()
+        self.assertEqual(0., score.hit_rate())
+        score(game, "Player2")
+        self.assertEqual(5, len(calls))
+
+
+class TranspositionTableTest(unittest.TestCase):
+    """Unit tests for the transposition table"""
+
+    def setUp(self):
+        reload(game_agent)
+        self.player1 = "Player1"
+        self.player2 = "Player2"
+
+    def test_always_replace(self):
+        # keys 1 and 5 map to the same slot of a four entry table
+        tt = game_agent.TranspositionTable(4, "always")
+        tt.store(1, 3, game_agent.LOWER, 1., (1, 1))
+        tt.store(5, 1, game_agent.EXACT, 2., (0, 0))
+        self.assertIsNone(tt.probe(1))
+        self.assertEqual((1, game_agent.EXACT, 2., (0, 0)), tt.probe(5))
+
+    def test_depth_preferred(self):
+        tt = game_agent.TranspositionTable(4, "depth")
+        tt.store(1, 3, game_agent.LOWER, 1., (1, 1))
+        tt.store(5, 1, game_agent.EXACT, 2., (0, 0))
+        self.assertEqual((3, game_agent.LOWER, 1., (1, 1)), tt.probe(1))
+        self.assertIsNone(tt.probe(5))
+
+        # entries from an earlier search are replaced regardless of depth
+        tt.new_search()
+        tt.store(5, 1, game_agent.EXACT, 2., (0, 0))
+        self.assertIsNone(tt.probe(1))
+
+    def test_two_tier(self):
+        # keys 1 and 3 map to the same bucket of a two bucket table
+        tt = game_agent.TranspositionTable(4, "two-tier")
+        tt.store(1, 3, game_agent.LOWER, 1., (1, 1))
+        tt.store(3, 1, game_agent.EXACT, 2., (0, 0))
+        self.assertEqual((3, game_agent.LOWER, 1., (1, 1)), tt.probe(1))
+        self.assertEqual((1, game_agent.EXACT, 2., (0, 0)), tt.probe(3))
+
+    def test_search_values_unchanged(self):
+        for game in random_positions(self.player1, self.player2):
+            self.assertEqual(search_values(game, range(1, 6)),
+                             search_values(game, range(1, 6),
+                                           tt=game_agent.TranspositionTable(2 ** 8)))
+
+
+class MoveOrderingTest(unittest.TestCase):
+    """Unit tests for the alpha-beta move ordering stage"""
+
+    def setUp(self):
+        reload(game_agent)
+        self.player1 = "Player1"
+        self.player2 = "Player2"
+
+    def test_order(self):
+        ordering = game_agent.MoveOrdering()
+        ordering.new_search()
+        ordering.record_cutoff((1, 1), 2, 1)
+        ordering.record_cutoff((3, 3), 2, 3)
+        ordering.record_cutoff((4, 4), 1, 2)
+        moves = [(0, 0), (1, 1), (2, 2), (3, 3), (4, 4)]
+        self.assertEqual([(2, 2), (3, 3), (1, 1), (0, 0), (4, 4)],
+                         ordering.order(list(moves), 2, (2, 2)))
+        self.assertEqual([(4, 4), (0, 0), (1, 1), (2, 2), (3, 3)],
+                         ordering.order(list(moves), 1))
+        self.assertEqual([(3, 3), (1, 1), (0, 0), (2, 2), (4, 4)],
+                         ordering.order(list(moves), 0))
+
+    def test_search_values_unchanged(self):
+        for game in random_positions(self.player1, self.player2):
+            self.assertEqual(search_values(game, range(1, 6)),
+                             search_values(game, range(1, 6),
+                                           move_ordering=game_agent.MoveOrdering()))
+            self.assertEqual(search_values(game, range(1, 6)),
+                             search_values(game, range(1, 6),
+                                           tt=game_agent.TranspositionTable(2 ** 8),
+                                           move_ordering=game_agent.MoveOrdering()))
+
+
+class PrincipalVariationTest(unittest.TestCase):
+    """Unit tests for PVS and aspiration windows"""
+
+    def setUp(self):
+        reload(game_agent)
+        self.player1 = "Player1"
+        self.player2 = "Player2"
+
+    def test_pvs_values_unchanged(self):
+        for game in random_positions(self.player1, self.player2):
+            self.assertEqual(search_values(game, range(1, 6)),
+                             search_values(game, range(1, 6), pvs=True))
+            self.assertEqual(search_values(game, range(1, 6)),
+                             search_values(game, range(1, 6), pvs=True,
+                                           tt=game_agent.TranspositionTable(2 ** 8),
+                                           move_ordering=game_agent.MoveOrdering()))
+
+    def test_aspiration_scores_unchanged(self):
+        for game in random_positions(self.player1, self.player2):
+            scores = []
+            for aspiration in (None, 0.5, 2.):
+                player = game_agent.AlphaBetaPlayer(score_fn=improved_score,
+                                                    pvs=True, aspiration=aspiration)
+                player.time_left = lambda: 1000.
+                board = game.copy()
+                board._player_1 = board._active_player = player
+                player.new_search()
+                score, iteration_scores = None, []
+                for depth in range(1, 6):
+                    score, _ = player.search_iteration(board, depth, score)
+                    iteration_scores.append(score)
+                self.assertEqual(list(range(1, 6)), sorted(player.node_counts))
+                scores.append(iteration_scores)
+            self.assertEqual(scores[0], scores[1])
+            self.assertEqual(scores[0], scores[2])
+
+
+class LazySMPTest(unittest.TestCase):
+    """Unit tests for the shared transposition table and Lazy SMP search"""
+
+    def setUp(self):
+        reload(game_agent)
+
+    def test_shared_table_entries(self):
+        tt = game_agent.SharedTranspositionTable(4, "two-tier")
+        self.assertIsNone(tt.probe(0))
+        tt.store(1, 3, game_agent.LOWER, 1.5, (1, 2))
+        tt.store(3, 1, game_agent.UPPER, float("-inf"), None)
+        tt.store(2 ** 64 - 2, 200, game_agent.EXACT, -2., (6, 6))
+        self.assertEqual((3, game_agent.LOWER, 1.5, (1, 2)), tt.probe(1))
+        self.assertEqual((1, game_agent.UPPER, float("-inf"), None), tt.probe(3))
+        self.assertEqual((200, game_agent.EXACT, -2., (6, 6)), tt.probe(2 ** 64 - 2))
+        self.assertIsNone(tt.probe(5))
+
+        # a torn write leaves the entry unreadable instead of corrupted
+        tt._scores[2] = 7.
+        self.assertIsNone(tt.probe(1))
+
+    def test_get_move(self):
+        player = game_agent.LazySMPPlayer(score_fn=improved_score, workers=1)
+        try:
+            game = isolation.Board(player, "Player2")
+            game.apply_move((2, 3))
+            game.apply_move((0, 5))
+            start = timeit.default_timer()
+            time_left = lambda: 150 - 1000 * (timeit.default_timer() - start)
+            move = player.get_move(game.copy(), time_left)
+            self.assertIn(move, game.get_legal_moves())
+            self.assertGreater(time_left(), 0)
+        finally:
+            player.close()
+
+
+class ParallelAlphaBetaTest(unittest.TestCase):
+    """Unit tests for root-split search on a process pool"""
+
+    def setUp(self):
+        reload(game_agent)
+
+    def test_merge_root_results(self):
+        inf = float("inf")
+        self.assertIsNone(game_agent._merge_root_results([[], []]))
+        results = [[(1, 1., (0, 0)), (2, 3., (0, 0)), (3, 0., (0, 0))],
+                   [(1, 2., (1, 2)), (2, -1., (1, 2))]]
+        self.assertEqual((2, 3., (0, 0)), game_agent._merge_root_results(results))
+
+        # a proven win is carried to depths the other subsets completed
+        results[1] = [(1, inf, (1, 2))]
+        self.assertEqual((3, inf, (1, 2)), game_agent._merge_root_results(results))
+
+    def test_get_move(self):
+        player = game_agent.ParallelAlphaBetaPlayer(score_fn=improved_score,
+                                                    processes=2)
+        try:
+            game = isolation.Board(player, "Player2")
+            game.apply_move((2, 3))
+            game.apply_move((0, 5))
+            start = timeit.default_timer()
+            time_left = lambda: 150 - 1000 * (timeit.default_timer() - start)
+            move = player.get_move(game.copy(), time_left)
+            self.assertIn(move, game.get_legal_moves())
+            self.assertGreater(time_left(), 0)
+        finally:
+            player.close()
+
+
+class EndgameTest(unittest.TestCase):
+    """Unit tests for the partition detector and the endgame solver"""
+
+    def setUp(self):
+        reload(game_agent)
+        self.player1 = "Player1"
+        self.player2 = "Player2"
+
+    def test_partition(self):
+        for board_class in (isolation.Board, isolation.BitBoard):
+            game = board_class(self.player1, self.player2, 5, 5)
+            self.assertFalse(game.is_partitioned())
+            game.apply_move((0, 0))
+            game.apply_move((4, 4))
+            self.assertFalse(game.is_partitioned())
+
+            # block every cell a knight could use to leave the corner (0, 0)
+            for r, c in [(1, 2), (2, 1)]:
+                game._board_state[r + c * 5] = 1
+                if board_class is isolation.BitBoard:
+                    game._blocked |= 1 << (r + c * 5)
+            self.assertEqual(0, game.reachable_cells(self.player1))
+            self.assertTrue(game.is_partitioned())
+
+    def test_longest_walk(self):
+        def longest(game, player):
+            best = 0
+            for move in game.get_legal_moves(player):
+                new_game = game.copy()
+                new_game._active_player = player
+                new_game._inactive_player = game.get_opponent(player)
+                new_game.apply_move(move)
+                best = max(best, 1 + longest(new_game, player))
+            return best
+
+        solver = game_agent.EndgameSolver()
+        rng = random.Random(0)
+        for _ in range(10):
+            game = isolation.BitBoard(self.player1, self.player2, 5, 5)
+            while game.get_legal_moves():
+                game.apply_move(rng.choice(game.get_legal_moves()))
+                if game.move_count > 2 and game.is_partitioned():
+                    break
+            for player in (self.player1, self.player2):
+                length, move = solver.solve(game, player)
+                self.assertEqual(longest(game, player), length)
+                if length:
+                    self.assertIn(move, game.get_legal_moves(player))
+
+
+class MCTSTest(unittest.TestCase):
+    """Unit tests for Monte Carlo Tree Search"""
+
+    def setUp(self):
+        reload(game_agent)
+
+    def test_get_move_reuses_tree(self):
+        player = game_agent.MCTSPlayer(rng=random.Random(0))
+        for board_class in (isolation.Board, isolation.BitBoard):
+            game = board_class(player, "Player2")
+            game.apply_move((2, 3))
+            game.apply_move((0, 5))
+            time_left = lambda: 1000. - 20 * player.playouts
+            move = player.get_move(game.copy(), time_left)
+            self.assertIn(move, game.get_legal_moves())
+            self.assertEqual(50, player.playouts)
+            game.apply_move(move)
+
+            # the playouts through the opponent's reply are kept
+            reply = game.get_legal_moves()[0]
+            game.apply_move(reply)
+            root = player._reuse_root(*_mcts_position(game))
+            self.assertIsNotNone(root)
+            self.assertEqual(reply, (player._move[root] % 7, player._move[root] // 7))
+            self.assertGreater(player._visits[root], 0)
+
+
+def _mcts_position(game):
+    """Return the (blocked, locs, side) encoding of a position used by
+    MCTSPlayer.
+    """
+    _, _, blocked, p1_loc, p2_loc, side, _, _ = game.snapshot()
+    return blocked, [p1_loc, p2_loc], side
+
+
+class SeededRandomTest(unittest.TestCase):
+    """Unit tests for reproducible games with seeded random number generators"""
+
+    def setUp(self):
+        reload(game_agent)
+
+    def test_game_replays(self):
+        histories = []
+        for _ in range(2):
+            player1 = RandomPlayer(rng=random.Random(1))
+            player2 = RandomPlayer(rng=random.Random(2))
+            game = isolation.Board(player1, player2, rng=random.Random(3))
+            game.apply_move((3, 3))
+            game.apply_move((0, 0))
+            histories.append(game.play()[1])
+        self.assertEqual(histories[0], histories[1])
+
+    def test_search_replays(self):
+        results = []
+        for _ in range(2):
+            player = game_agent.AlphaBetaPlayer(score_fn=improved_score,
+                                                rng=random.Random(0))
+            player.time_left = lambda: float("inf")
+            game = isolation.Board(player, "Player2", rng=random.Random(1))
+            game.apply_move((3, 3))
+            game.apply_move((0, 0))
+            player.new_search()
+            moves = [player.search_iteration(game, depth)[1] for depth in range(1, 6)]
+            results.append((moves, player.node_counts))
+        self.assertEqual(results[0], results[1])
+
+
+class DeadlineTest(unittest.TestCase):
+    """Unit tests for the node-counting deadline checks of the search"""
+
+    def setUp(self):
+        reload(game_agent)
+
+    def test_check_interval(self):
+        player = game_agent.AlphaBetaPlayer(score_fn=improved_score)
+        game = isolation.Board(player, "Player2")
+        game.apply_move((2, 3))
+        game.apply_move((0, 5))
+        reads = []
+
+        def time_left():
+            # every node takes 10 us; the threshold is crossed after node 3500
+            reads.append(player.nodes)
+            return 50. - 0.01 * player.nodes
+
+        player.time_left = time_left
+        with self.assertRaises(game_agent.SearchTimeout):
+            player.maximize(game, 8, float("-inf"), float("inf"))
+        self.assertEqual(3501, player.nodes)
+        self.assertLess(len(reads), 100)
+
+        player.time_left = lambda: 0.
+        with self.assertRaises(game_agent.SearchTimeout):
+            player.minimize(game, 8, float("-inf"), float("inf"))
+
+
+class TimeManagerTest(unittest.TestCase):
+    """Unit tests for the iterative deepening time manager"""
+
+    def setUp(self):
+        reload(game_agent)
+
+    def test_next_iteration(self):
+        clock = [150.]
+        manager = game_agent.TimeManager(patience=1., extension=2.)
+        manager.margin = 70.
+        manager.start(lambda: clock[0])
+        for nodes, duration in [(10, 1.), (40, 4.), (160, 16.)]:
+            clock[0] -= duration
+            manager.iteration_done(nodes, (1, 2))
+        self.assertAlmostEqual(64., manager.predict())
+        self.assertFalse(manager.next_iteration())
+        clock[0] -= 16.
+        manager.iteration_done(640, (3, 4))
+        self.assertAlmostEqual(64., manager.predict())
+        self.assertTrue(manager.unstable())
+        self.assertTrue(manager.next_iteration())
+
+        manager.margin = 5.
+        manager.record_timeout(1.)
+        self.assertEqual(6., manager.margin)
+
+    def test_get_move(self):
+        player = game_agent.AlphaBetaPlayer(score_fn=improved_score,
+                                            time_manager=game_agent.TimeManager())
+        game = isolation.Board(player, "Player2")
+        game.apply_move((2, 3))
+        game.apply_move((0, 5))
+        start = timeit.default_timer()
+        time_left = lambda: 150 - 1000 * (timeit.default_timer() - start)
+        move = player.get_move(game.copy(), time_left)
+
+        self.assertGreater(time_left(), 0)
+        self.assertIn(move, game.get_legal_moves())
+        # the margin can grow after a timeout, but never below the threshold
+        # the search used
+        self.assertLessEqual(player.TIMER_THRESHOLD, player.time_manager.margin)
+        self.assertLessEqual(player.time_manager.min_margin, player.TIMER_THRESHOLD)
+
+
+class SearchStatsTest(unittest.TestCase):
+    """Unit tests for the search statistics of AlphaBetaPlayer"""
+
+    def setUp(self):
+        reload(game_agent)
+
+    def test_get_move_stats(self):
+        player = game_agent.AlphaBetaPlayer(score_fn=improved_score,
+                                            collect_stats=True)
+        game = isolation.Board(player, "Player2")
+        game.apply_move((2, 3))
+        game.apply_move((0, 5))
+        start = timeit.default_timer()
+        time_left = lambda: 150 - 1000 * (timeit.default_timer() - start)
+        player.get_move(game.copy(), time_left)
+
+        stats = player.stats
+        self.assertEqual([stats], player.stats_history)
+        self.assertEqual(player.node_counts, stats.nodes)
+        self.assertEqual(max(player.node_counts), stats.max_depth)
+        self.assertGreater(stats.leaf_evaluations, 0)
+        self.assertEqual(stats.cutoffs, sum(stats.cutoff_indices.values()))
+        self.assertGreater(stats.total_time, stats.score_time + stats.movegen_time)
+        self.assertIs(improved_score, player.score)
+        self.assertEqual(stats.max_depth, len(json.loads(stats.to_json())["nodes"]))
+
+
+class SearchTraceTest(unittest.TestCase):
+    """Unit tests for the search tree traces of AlphaBetaPlayer"""
+
+    def setUp(self):
+        reload(game_agent)
+        fd, self.path = tempfile.mkstemp(suffix=".trace")
+        os.close(fd)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def _search(self, trace=None):
+        player = game_agent.AlphaBetaPlayer(score_fn=improved_score, trace=trace)
+        player.time_left = lambda: 1000.
+        game = isolation.Board(player, "Player2", rng=random.Random(0))
+        game.apply_move((2, 3))
+        game.apply_move((0, 5))
+        return player, game, player.search_iteration(game, 3)
+
+    def test_trace_iteration(self):
+        _, _, expected = self._search()
+        with search_trace.TraceWriter(self.path, buffer_size=64) as trace:
+            player, game, result = self._search(trace)
+        self.assertEqual(expected, result)
+        self.assertEqual(player.node_counts[3], trace.count)
+
+        summary, = search_trace.summarize(self.path)
+        self.assertEqual(player.node_counts[3], summary["nodes"])
+        self.assertEqual((3, expected[0], expected[1], False),
+                         (summary["depth"], summary["score"], summary["move"],
+                          summary["aborted"]))
+        self.assertEqual(len(game.get_legal_moves()), summary["nodes_per_ply"][1])
+        self.assertEqual(set(game.get_legal_moves()),
+                         {move for move, _ in summary["root_moves"]})
+        self.assertEqual(expected[0], max(score for _, score in summary["root_moves"]))
+
+        for node, children in search_trace.iter_nodes(self.path):
+            if not children:
+                continue
+            if node.flags & search_trace.MAXIMIZING:
+                self.assertEqual(node.score, max(child.score for child in children))
+            else:
+                self.assertEqual(node.score, min(child.score for child in children))
+        self.assertEqual(player.node_counts[3], sum(1 for _ in search_trace.read_trace(self.path)))
+
+
+@unittest.skipIf(batch_eval is None, "batch evaluation requires NumPy")
+class BatchEvalTest(unittest.TestCase):
+    """Unit tests for the vectorized evaluation functions"""
+
+    def setUp(self):
+        reload(game_agent)
+        self.player1 = "Player1"
+        self.player2 = "Player2"
+
+    def random_games(self, count=10):
+        """Return every position after the first two moves of random games
+        played to the end.
+        """
+        rng = random.Random(0)
+        boards = []
+        for _ in range(count):
+            game = isolation.Board(self.player1, self.player2, rng=rng)
+            while True:
+                if game.move_count >= 2:
+                    boards.append(game.copy())
+                moves = game.get_legal_moves()
+                if not moves:
+                    break
+                game.apply_move(rng.choice(moves))
+        return boards
+
+    def test_scores_match(self):
+        boards = self.random_games()
+        for player in (self.player1, self.player2):
+            batch = batch_eval.PositionBatch.from_boards(boards, player)
+            self.assertEqual([improved_score(game, player) for game in boards],
+                             batch_eval.batch_improved_score(batch).tolist())
+            self.assertEqual([game_agent.custom_score_3(game, player) for game in boards],
+                             batch_eval.batch_custom_score_3(batch).tolist())
+
+    def test_children_match(self):
+        score = batch_eval.BatchScore(game_agent.custom_score_3)
+        for game in self.random_games(3):
+            moves = game.get_legal_moves()
+            for player in (self.player1, self.player2):
+                self.assertEqual([game_agent.custom_score_3(game.forecast_move(move), player)
+                                  for move in moves],
+                                 score(game, moves, player))
+        with self.assertRaises(ValueError):
+            batch_eval.BatchScore(game_agent.custom_score_1)
+
+    def test_search_values_unchanged(self):
+        for game in random_positions(self.player1, self.player2):
+            self.assertEqual(search_values(game, range(1, 5)),
+                             search_values(game, range(1, 5),
+                                           batch_score=batch_eval.BatchScore(improved_score)))
+
+
+def random_positions(player1, player2, count=10, seed=0):
+    """Generate random mid-game BitBoard positions with player 1 to move. """
+    rng = random.Random(seed)
+    for _ in range(count):
+        game = isolation.BitBoard(player1, player2)
+        num_moves = 2 * rng.randint(1, 10)
+        while game.move_count < num_moves and game.get_legal_moves():
+            game.apply_move(rng.choice(game.get_legal_moves()))
+        if game.active_player == player1 and game.get_legal_moves():
+            yield game
+
+
+def search_values(game, depths, **options):
+    """Return the alpha-beta value of the position for player 1 at each of the
+    specified depths, searched in order by an AlphaBetaPlayer built with the
+    specified options.
+    """
+    player = game_agent.AlphaBetaPlayer(score_fn=improved_score, **options)
+    player.time_left = lambda: 1000.
+    game = game.copy()
+    game._player_1 = game._active_player = player
+    values = []
+    for depth in depths:
+        player._root_depth = depth
+        values.append(player.maximize(game, depth, float("-inf"), float("inf")))
+    return values
+
 if __name__ == '__main__':
     unittest.main()
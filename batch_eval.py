@@ -0,0 +1,245 @@
+"""Evaluate many Isolation positions at once with NumPy.
+
+Positions are stacked into a `PositionBatch`: one row of blocked cells per
+position, and the locations of the two players as cell indices. The features
+used by the heuristics (mobility, center distance, corners, and the distance
+between the players) are computed for the whole batch with array operations,
+and the vectorized heuristics return the same values as their scalar
+counterparts in `sample_players` and `game_agent`.
+
+Pass a `BatchScore` as the `batch_score` option of an AlphaBetaPlayer to
+score all the children of the nodes one ply above the horizon at once:
+
+    player = AlphaBetaPlayer(score_fn=improved_score,
+                             batch_score=BatchScore(improved_score))
+
+or build batches directly to score thousands of positions per call:
+
+    batch = PositionBatch.from_boards(boards, player)
+    scores = batch_improved_score(batch)
+
+This module requires NumPy; the rest of the project does not import it.
+"""
+import numpy as np
+
+from isolation import Board, board_geometry
+
+# Per board size (width, height): the knight move adjacency matrix and the
+# per-cell tables of the geometry as arrays
+_TABLES = {}
+
+
+def _tables(width, height):
+    """Return the array tables of a board size, building them on first use. """
+    tables = _TABLES.get((width, height))
+    if tables is None:
+        geometry = board_geometry(width, height)
+        cells = width * height
+        adjacency = np.zeros((cells, cells), dtype=bool)
+        for idx, neighbours in enumerate(geometry.neighbour_indices):
+            adjacency[idx, list(neighbours)] = True
+        rows, cols = np.array(geometry.coords).T
+        tables = _TABLES[(width, height)] = {
+            "adjacency": adjacency, "rows": rows, "cols": cols,
+            "center_distances": np.array(geometry.center_distances),
+            "is_corner": np.array(geometry.is_corner)}
+    return tables
+
+
+def _unpack_cells(masks, cells):
+    """Return a bool array with one row per bitmask in masks (bit i set for
+    cell i blocked).
+    """
+    nbytes = (cells + 7) // 8
+    data = b"".join(mask.to_bytes(nbytes, "little") for mask in masks)
+    bits = np.frombuffer(data, dtype=np.uint8).reshape(len(masks), nbytes)
+    return np.unpackbits(bits, axis=1, bitorder="little")[:, :cells].astype(bool)
+
+
+class PositionBatch:
+    """A stack of positions of one board size, seen from the point of view of
+    one player.
+
+    Locations are cell indices (`row + col * height`), or -1 for a player who
+    has not moved yet.
+
+    Parameters
+    ----------
+    width, height : int
+        The size of the boards.
+
+    blocked : numpy.ndarray
+        Bool array of shape (n, width * height); True for blocked cells.
+
+    own, opp : numpy.ndarray
+        Int arrays of shape (n,) with the locations of the player and of the
+        opponent.
+
+    own_to_move : numpy.ndarray
+        Bool array of shape (n,); True if the player is the active player.
+    """
+
+    def __init__(self, width, height, blocked, own, opp, own_to_move):
+        self.width = width
+        self.height = height
+        self.blocked = blocked
+        self.own = own
+        self.opp = opp
+        self.own_to_move = own_to_move
+
+    def __len__(self):
+        return len(self.own)
+
+    @classmethod
+    def from_boards(cls, boards, player):
+        """Stack the positions of a sequence of boards of the same size, seen
+        from the point of view of player (who must play in every board).
+        """
+        boards = list(boards)
+        width, height = boards[0].width, boards[0].height
+        blocked = _unpack_cells([board.snapshot()[2] for board in boards],
+                                width * height)
+        locations = np.array([[-1 if loc is None else loc[0] + loc[1] * height
+                               for loc in (board.get_player_location(player),
+                                           board.get_player_location(board.get_opponent(player)))]
+                              for board in boards], dtype=np.intp).reshape(-1, 2)
+        own_to_move = np.array([board.active_player == player for board in boards],
+                               dtype=bool)
+        return cls(width, height, blocked, locations[:, 0], locations[:, 1],
+                   own_to_move)
+
+    @classmethod
+    def from_children(cls, game, moves, player):
+        """Stack the positions reached by applying each move to game, seen
+        from the point of view of player, without building the child boards.
+        """
+        cells = game.width * game.height
+        _, height, mask, p1_loc, p2_loc, p2_to_move = game.snapshot()[:6]
+        idx = np.array([r + c * height for r, c in moves], dtype=np.intp)
+        blocked = np.repeat(_unpack_cells([mask], cells), len(idx), axis=0)
+        blocked[np.arange(len(idx)), idx] = True
+
+        # the active player of game makes the move
+        mover_is_player = game.active_player == player
+        if not mover_is_player and game.inactive_player != player:
+            raise RuntimeError("`player` must be an object registered as a "
+                               "player in the current game.")
+        waiting_loc = p1_loc if p2_to_move else p2_loc
+        waiting = np.full(len(idx), -1 if waiting_loc is None else waiting_loc,
+                          dtype=np.intp)
+        own, opp = (idx, waiting) if mover_is_player else (waiting, idx)
+        return cls(game.width, height, blocked, own, opp,
+                   np.full(len(idx), not mover_is_player))
+
+
+def features(batch):
+    """Return a dict of the features of every position of a batch, as arrays
+    of shape (len(batch),):
+
+    own_moves, opp_moves : int
+        The number of legal moves of each player (`Board.mobility`).
+
+    own_center, opp_center : float
+        The squared distance of each player to the center of the board
+        (`Geometry.center_distances`); NaN for a player who has not moved.
+
+    own_corner, opp_corner : bool
+        Whether each player is in a corner of the board.
+
+    distance : float
+        The distance between the players (`game_agent.compute_distance`);
+        NaN if a player has not moved.
+
+    own_won, own_lost : bool
+        Whether the player has won or lost (`Board.is_winner`,
+        `Board.is_loser`).
+    """
+    tables = _tables(batch.width, batch.height)
+    open_cells = ~batch.blocked
+    open_count = np.count_nonzero(open_cells, axis=1)
+    placed = {}
+    result = {}
+    for name, loc in (("own", batch.own), ("opp", batch.opp)):
+        moved = loc >= 0
+        cell = np.where(moved, loc, 0)
+        reachable = np.count_nonzero(open_cells & tables["adjacency"][cell], axis=1)
+        result[name + "_moves"] = np.where(moved, reachable, open_count)
+        result[name + "_center"] = np.where(moved, tables["center_distances"][cell], np.nan)
+        result[name + "_corner"] = moved & tables["is_corner"][cell]
+        placed[name] = moved, cell
+
+    (own_moved, own_cell), (opp_moved, opp_cell) = placed["own"], placed["opp"]
+    distance = np.sqrt((tables["rows"][own_cell] - tables["rows"][opp_cell]) ** 2 +
+                       (tables["cols"][own_cell] - tables["cols"][opp_cell]) ** 2)
+    result["distance"] = np.where(own_moved & opp_moved, distance, np.nan)
+
+    active_moves = np.where(batch.own_to_move, result["own_moves"], result["opp_moves"])
+    result["own_won"] = ~batch.own_to_move & (active_moves == 0)
+    result["own_lost"] = batch.own_to_move & (active_moves == 0)
+    return result
+
+
+def batch_improved_score(batch):
+    """Vectorized `sample_players.improved_score`. """
+    f = features(batch)
+    score = (f["own_moves"] - f["opp_moves"]).astype(float)
+    score[f["own_won"]] = float("inf")
+    score[f["own_lost"]] = float("-inf")
+    return score
+
+
+def batch_custom_score_3(batch):
+    """Vectorized `game_agent.custom_score_3`. Like the scalar function, it
+    needs both players on the board; the score is NaN otherwise.
+    """
+    f = features(batch)
+    # same order of operations as the scalar function, for identical floats
+    own_moves = f["own_moves"] - np.where(f["own_corner"], 2, 0) + f["distance"]
+    score = own_moves - 2 * f["opp_moves"]
+    score[f["own_won"]] = float("inf")
+    return score
+
+
+# The vectorized equivalents of the scalar evaluation functions, by name
+VECTORIZED = {
+    "improved_score": batch_improved_score,
+    "custom_score_3": batch_custom_score_3,
+    "custom_score": batch_custom_score_3,
+}
+
+
+class BatchScore:
+    """Adapter scoring all the children of a node with the vectorized
+    equivalent of an evaluation function, for the `batch_score` option of
+    AlphaBetaPlayer.
+
+    Calling the adapter with (game, moves, player) returns the list of
+    `score_fn(game.forecast_move(move), player)` for every move. Positions
+    where a player has not moved yet are left to score_fn, since
+    custom_score_3 is not defined for them.
+
+    Parameters
+    ----------
+    score_fn : callable
+        An evaluation function whose name has a vectorized equivalent in
+        VECTORIZED.
+
+    batch_fn : callable (optional)
+        The vectorized equivalent of score_fn, taking a PositionBatch and
+        returning an array of scores. Looked up in VECTORIZED if None.
+    """
+
+    def __init__(self, score_fn, batch_fn=None):
+        if batch_fn is None:
+            name = getattr(score_fn, "__name__", None)
+            if name not in VECTORIZED:
+                raise ValueError("No vectorized equivalent of {}".format(score_fn))
+            batch_fn = VECTORIZED[name]
+        self.score_fn = score_fn
+        self.batch_fn = batch_fn
+
+    def __call__(self, game, moves, player):
+        if (game.get_player_location(game.inactive_player) == Board.NOT_MOVED or
+                len(moves) < 2):
+            return [self.score_fn(game.forecast_move(move), player) for move in moves]
+        return self.batch_fn(PositionBatch.from_children(game, moves, player)).tolist()
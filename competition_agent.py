@@ -4,8 +4,11 @@ champions) in a tournament.
 
          COMPLETING AND SUBMITTING A COMPETITION AGENT IS OPTIONAL
 """
+import math
 import random
 
+from array import array
+
 
 class SearchTimeout(Exception):
     """Subclass base exception for code clarity. """
@@ -36,6 +39,23 @@ def custom_score(game, player):
     raise NotImplementedError
 
 
+def _knight_masks(width, height):
+    """Return a tuple, indexed by cell (row + col * height), of bitmasks of
+    the cells a knight on each cell can move to on an empty board.
+    """
+    directions = [(-2, -1), (-2, 1), (-1, -2), (-1, 2),
+                  (1, -2), (1, 2), (2, -1), (2, 1)]
+    masks = []
+    for idx in range(width * height):
+        r, c = idx % height, idx // height
+        mask = 0
+        for dr, dc in directions:
+            if 0 <= r + dr < height and 0 <= c + dc < width:
+                mask |= 1 << (r + dr + (c + dc) * height)
+        masks.append(mask)
+    return tuple(masks)
+
+
 class CustomPlayer:
     """Game-playing agent to use in the optional player vs player Isolation
     competition.
@@ -59,6 +79,11 @@ class CustomPlayer:
         the PvP competition uses more accurate timers that are not cross-
         platform compatible, so a limit of 1ms (vs 10ms for the other classes)
         is generally sufficient.
+
+    The player searches with Monte Carlo Tree Search like
+    `game_agent.MCTSPlayer`. The search is repeated here so that this file
+    can be submitted on its own, and the position is read with the basic
+    `isolation.Board` API instead of `Board.snapshot()`.
     """
 
     def __init__(self, data=None, timeout=1.):
@@ -66,16 +91,50 @@ class CustomPlayer:
         self.time_left = None
         self.TIMER_THRESHOLD = timeout
 
+        # Monte Carlo Tree Search state (see `game_agent.MCTSPlayer`)
+        self.exploration = math.sqrt(2)
+        self.max_nodes = 2**18
+        self.rng = random.Random()
+        self.playouts = 0
+        self.total_playouts = 0
+        self.total_time = 0.
+        self._masks = None
+        self._move_cache = None
+        self._full = 0
+        self._root = None
+        self._root_state = None
+        self._new_tree()
+
+
+    def _new_tree(self):
+        """Discard the search tree. For every node, the arrays hold the cell
+        index of the move leading to it, its parent, the index of its first
+        child (-1 until the node is expanded; the children of a node are
+        stored consecutively), its number of children, the number of playouts
+        through it won by the player who moved into it, and its number of
+        playouts.
+        """
+        self._move = array("l")
+        self._parent = array("l")
+        self._first_child = array("l")
+        self._num_children = array("l")
+        self._wins = array("l")
+        self._visits = array("l")
+
+    def _add_node(self, move, parent):
+        """Append an unexpanded node to the tree and return its index. """
+        self._move.append(move)
+        self._parent.append(parent)
+        self._first_child.append(-1)
+        self._num_children.append(0)
+        self._wins.append(0)
+        self._visits.append(0)
+        return len(self._move) - 1
+
     def get_move(self, game, time_left):
         """Search for the best move from the available legal moves and return a
         result before the time limit expires.
 
-        **********************************************************************
-        NOTE: If time_left < 0 when this function returns, the agent will
-              forfeit the game due to timeout. You must return _before_ the
-              timer reaches 0.
-        **********************************************************************
-
         Parameters
         ----------
         game : `isolation.Board`
@@ -93,5 +152,167 @@ class CustomPlayer:
             Board coordinates corresponding to a legal move; may return
             (-1, -1) if there are no available legal moves.
         """
-        # OPTIONAL: Finish this function!
-        raise NotImplementedError
+        self.time_left = time_left
+        start = time_left()
+
+        height = game.height
+        if self._masks is None or len(self._masks) != game.width * height:
+            self._masks = _knight_masks(game.width, height)
+            self._move_cache = tuple({} for _ in self._masks)
+            self._full = (1 << (game.width * height)) - 1
+            self._root = None
+
+        # encode the position with the basic Board API only; side 0 is this
+        # player and side 1 the opponent
+        blocked = self._full
+        for r, c in game.get_blank_spaces():
+            blocked ^= 1 << (r + c * height)
+        locs = []
+        for player in (self, game.get_opponent(self)):
+            loc = game.get_player_location(player)
+            locs.append(None if loc is None else loc[0] + loc[1] * height)
+        side = 0
+
+        moves = self._moves(blocked, locs[side])
+        if not moves:
+            return -1, -1
+
+        root = self._reuse_root(blocked, locs, side)
+        if root is None:
+            self._new_tree()
+            root = self._add_node(-1, -1)
+
+        self.playouts = 0
+        while time_left() > self.TIMER_THRESHOLD:
+            self._iterate(root, blocked, locs[:], side)
+            self.playouts += 1
+        self.total_playouts += self.playouts
+        self.total_time += (start - time_left()) / 1000.
+
+        if self._first_child[root] == -1:
+            # no playout finished in time
+            return moves[0] % height, moves[0] // height
+
+        # keep the subtree of the chosen move for the next turn
+        first = self._first_child[root]
+        children = range(first, first + self._num_children[root])
+        best = max(children, key=self._visits.__getitem__)
+        move = self._move[best]
+        locs[side] = move
+        self._root = best
+        self._root_state = (blocked | (1 << move), locs, side ^ 1)
+        return move % height, move // height
+
+    def _reuse_root(self, blocked, locs, side):
+        """Return the node of the current position in the tree kept from the
+        previous turn, or None if the position is not in the tree.
+        """
+        old_root, state = self._root, self._root_state
+        self._root = self._root_state = None
+        if (old_root is None or state[2] == side or
+                2 * len(self._move) > self.max_nodes):
+            return None
+
+        old_blocked, old_locs, _ = state
+        move = locs[side ^ 1]
+        if (move is None or blocked != old_blocked | (1 << move) or
+                locs[side] != old_locs[side]):
+            return None
+
+        first = self._first_child[old_root]
+        if first == -1:
+            return None
+        for child in range(first, first + self._num_children[old_root]):
+            if self._move[child] == move:
+                return child
+        return None
+
+    def _moves(self, blocked, loc):
+        """Return a sequence of the cell indices a player at cell index loc
+        can move to (any open cell if loc is None).
+        """
+        if loc is None:
+            open_cells = self._full & ~blocked
+            return [idx for idx in range(len(self._masks))
+                    if (open_cells >> idx) & 1]
+
+        open_mask = self._masks[loc] & ~blocked
+        cache = self._move_cache[loc]
+        moves = cache.get(open_mask)
+        if moves is None:
+            moves = []
+            mask = open_mask
+            while mask:
+                low_bit = mask & -mask
+                moves.append(low_bit.bit_length() - 1)
+                mask ^= low_bit
+            moves = cache[open_mask] = tuple(moves)
+        return moves
+
+    def _iterate(self, root, blocked, locs, side):
+        """Run one selection, expansion, playout and backpropagation step from
+        the root position (blocked, locs, side).
+        """
+        move_of, first_child = self._move, self._first_child
+        num_children, wins, visits = self._num_children, self._wins, self._visits
+        c = self.exploration
+
+        # selection: unvisited children first, then by UCT value
+        node = root
+        while first_child[node] != -1 and num_children[node]:
+            first = first_child[node]
+            log_visits = math.log(visits[node])
+            best_value = -1.
+            for child in range(first, first + num_children[node]):
+                n = visits[child]
+                if not n:
+                    node = child
+                    break
+                value = wins[child] / n + c * math.sqrt(log_visits / n)
+                if value > best_value:
+                    best_value, node = value, child
+            blocked |= 1 << move_of[node]
+            locs[side] = move_of[node]
+            side ^= 1
+
+        # expansion: add all the children of the leaf and step into one
+        if first_child[node] == -1 and len(move_of) < self.max_nodes:
+            moves = self._moves(blocked, locs[side])
+            first_child[node] = len(move_of)
+            num_children[node] = len(moves)
+            for move in moves:
+                self._add_node(move, node)
+            if moves:
+                node = first_child[node] + self.rng.randrange(len(moves))
+                blocked |= 1 << move_of[node]
+                locs[side] = move_of[node]
+                side ^= 1
+
+        # playout; `side` is the player to move at the leaf
+        winner = self._playout(blocked, locs, side)
+
+        # backpropagation; each node counts the wins of the player who moved
+        # into it, who is the opponent of the player to move at the node
+        parent = self._parent
+        mover = side ^ 1
+        while node != -1:
+            visits[node] += 1
+            if winner == mover:
+                wins[node] += 1
+            mover ^= 1
+            node = parent[node] if node != root else -1
+
+    def _playout(self, blocked, locs, side):
+        """Play random moves from the position (blocked, locs, side) until one
+        player cannot move, and return the index (0 or 1) of the winner.
+        """
+        choice = self.rng.choice
+        moves_from = self._moves
+        while True:
+            moves = moves_from(blocked, locs[side])
+            if not moves:
+                return side ^ 1
+            move = choice(moves)
+            blocked |= 1 << move
+            locs[side] = move
+            side ^= 1
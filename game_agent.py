@@ -5,6 +5,8 @@ and include the results in your report.
 import math
 import random
 
+from array import array
+
 
 class SearchTimeout(Exception):
     """Subclass base exception for code clarity. """
@@ -30,7 +32,7 @@ def compute_corner_weight(game, player):
     :return: int
         Weight factor if player is in a corner
     """
-    if game.get_player_location(player) in corner_positions:
+    if game.get_player_location(player) in game.geometry.corners:
         return 2
     return 0
 
@@ -62,8 +64,8 @@ def custom_score_1(game, player):
     if game.is_winner(player):
         return float("inf")
 
-    own_moves = len(game.get_legal_moves(player))
-    opp_moves = len(game.get_legal_moves(game.get_opponent(player)))
+    own_moves = game.mobility(player)
+    opp_moves = game.mobility(game.get_opponent(player))
 
     # penalize by subtracting the corner weight from own moves
     own_moves -= compute_corner_weight(game, player)
@@ -118,8 +120,8 @@ def custom_score_2(game, player):
     if game.is_winner(player):
         return float("inf")
 
-    own_moves = len(game.get_legal_moves(player))
-    opp_moves = len(game.get_legal_moves(game.get_opponent(player)))
+    own_moves = game.mobility(player)
+    opp_moves = game.mobility(game.get_opponent(player))
 
     # calc distance and add to own moves
     distance = compute_distance(game, player)
@@ -154,8 +156,8 @@ def custom_score_3(game, player):
     if game.is_winner(player):
         return float("inf")
 
-    own_moves = len(game.get_legal_moves(player))
-    opp_moves = len(game.get_legal_moves(game.get_opponent(player)))
+    own_moves = game.mobility(player)
+    opp_moves = game.mobility(game.get_opponent(player))
 
     own_moves -= compute_corner_weight(game, player)
     own_moves += compute_distance(game, player)
@@ -192,6 +194,661 @@ def custom_score(game, player):
     return custom_score_3(game, player)
 
 
+class CachedScore:
+    """Memoizing wrapper for an evaluation function, which can be passed as
+    the `score_fn` of any IsolationPlayer:
+
+        AlphaBetaPlayer(score_fn=CachedScore(custom_score))
+
+    Scores are keyed on the Zobrist key of the position (`game.zobrist_key`)
+    and on which side of the position the evaluating player is on, so a
+    cache stays valid across the turns of a game and whichever side the
+    player plays. The least recently used entry is evicted when the cache
+    is full.
+
+    The wrapped function must only depend on the position and on the side
+    of the player.
+
+    Parameters
+    ----------
+    score_fn : callable
+        The evaluation function to memoize.
+
+    max_entries : int (optional)
+        The maximum number of scores held by the cache.
+    """
+
+    def __init__(self, score_fn, max_entries=2 ** 16):
+        from collections import OrderedDict
+
+        self.score_fn = score_fn
+        self.max_entries = max_entries
+        self.lookups = 0
+        self.hits = 0
+        self._cache = OrderedDict()
+
+    def __call__(self, game, player):
+        key = game.zobrist_key << 1 | (player == game.active_player)
+        cache = self._cache
+        self.lookups += 1
+        score = cache.get(key)
+        if score is not None:
+            self.hits += 1
+            cache.move_to_end(key)
+            return score
+
+        score = cache[key] = self.score_fn(game, player)
+        if len(cache) > self.max_entries:
+            cache.popitem(last=False)
+        return score
+
+    def clear(self):
+        """Remove every score from the cache and reset the counters. """
+        self._cache.clear()
+        self.lookups = self.hits = 0
+
+    def hit_rate(self):
+        """Return the fraction of lookups answered from the cache (0 if the
+        cache has not been used).
+        """
+        return self.hits / self.lookups if self.lookups else 0.
+
+
+# Bound types stored in the transposition table
+EXACT, LOWER, UPPER = 0, 1, 2
+
+
+class TranspositionTable:
+    """Fixed-size table of search results keyed on the Zobrist key of a
+    position (`game.zobrist_key`).
+
+    Each entry stores the search depth, the bound type (EXACT, LOWER or
+    UPPER), the score and the best move found for a position. All storage is
+    allocated up front, so the table never grows beyond `max_entries`
+    positions.
+
+    Scores are stored from the point of view of the searching player, so a
+    table must not be shared between players with different score functions.
+
+    Parameters
+    ----------
+    max_entries : int (optional)
+        Maximum number of positions held by the table (rounded down to a
+        power of two).
+
+    replacement : str (optional)
+        Replacement policy applied when two positions map to the same slot:
+        "depth" keeps the entry searched to the greater depth (entries left
+        over from earlier searches are always replaced), "always" overwrites
+        the existing entry, and "two-tier" keeps a depth-preferred and an
+        always-replace slot for every bucket.
+    """
+
+    def __init__(self, max_entries=2 ** 16, replacement="two-tier"):
+        if replacement not in ("depth", "always", "two-tier"):
+            raise ValueError("Unknown replacement policy: {}".format(replacement))
+        size = 1 << (max(2, max_entries).bit_length() - 1)
+        self.replacement = replacement
+        self.size = size
+        self._slots = 2 if replacement == "two-tier" else 1
+        self._mask = size // self._slots - 1
+        self._keys = [None] * size
+        self._depths = [0] * size
+        self._flags = [EXACT] * size
+        self._scores = [0.] * size
+        self._moves = [None] * size
+        self._ages = [0] * size
+        self.age = 0
+        self.probes = 0
+        self.hits = 0
+
+    def new_search(self):
+        """Mark the entries stored so far as belonging to an earlier search,
+        making them preferred candidates for replacement.
+        """
+        self.age += 1
+
+    def clear(self):
+        """Remove every entry from the table. """
+        self._keys = [None] * self.size
+        self._moves = [None] * self.size
+        self.probes = self.hits = 0
+
+    def probe(self, key):
+        """Return the entry stored for a position as a tuple (depth, flag,
+        score, move), or None if the position is not in the table.
+        """
+        self.probes += 1
+        slot = (key & self._mask) * self._slots
+        for slot in range(slot, slot + self._slots):
+            if self._keys[slot] == key:
+                self.hits += 1
+                return (self._depths[slot], self._flags[slot],
+                        self._scores[slot], self._moves[slot])
+        return None
+
+    def store(self, key, depth, flag, score, move):
+        """Record the result of searching a position to the given depth. """
+        slot = (key & self._mask) * self._slots
+        if self.replacement != "always" and self._keys[slot] != key:
+            if (self._depths[slot] > depth and self._ages[slot] == self.age
+                    and self._keys[slot] is not None):
+                if self._slots == 1:
+                    return
+                # the depth-preferred slot holds a deeper search result
+                # from this search, so use the always-replace slot
+                slot += 1
+        self._keys[slot] = key
+        self._depths[slot] = depth
+        self._flags[slot] = flag
+        self._scores[slot] = score
+        self._moves[slot] = move
+        self._ages[slot] = self.age
+
+
+class SharedTranspositionTable(TranspositionTable):
+    """Transposition table stored in shared memory, so that it can be used by
+    several search processes at once (see `LazySMPPlayer`). The table must be
+    handed to the other processes when they are started.
+
+    Entries are written without locking. Every slot stores the position key
+    XORed with the packed entry, so a probe that reads a slot while another
+    process is writing it sees a key mismatch rather than a corrupted entry.
+    Moves are packed in 8 bits, which limits boards to 15 rows and columns.
+
+    See `TranspositionTable` for the parameters.
+    """
+
+    def __init__(self, max_entries=2 ** 16, replacement="two-tier"):
+        # multiprocessing is not available in the project assistant sandbox,
+        # so it is only imported by the classes that need it
+        from multiprocessing import RawArray
+
+        if replacement not in ("depth", "always", "two-tier"):
+            raise ValueError("Unknown replacement policy: {}".format(replacement))
+        size = 1 << (max(2, max_entries).bit_length() - 1)
+        self.replacement = replacement
+        self.size = size
+        self._slots = 2 if replacement == "two-tier" else 1
+        self._mask = size // self._slots - 1
+        self._checks = RawArray('Q', size)
+        self._data = RawArray('Q', size)
+        self._scores = RawArray('d', size)
+        self.age = 0
+        self.probes = 0
+        self.hits = 0
+
+    def clear(self):
+        """Remove every entry from the table. """
+        self._data[:] = [0] * self.size
+        self.probes = self.hits = 0
+
+    def _read(self, slot):
+        """Return the key and unpacked entry held by a slot as a tuple (key,
+        depth, flag, score, move, age), or None if the slot is empty.
+        """
+        data = self._data[slot]
+        score = self._scores[slot]
+        if not data >> 34:
+            return None
+        key = self._checks[slot] ^ data ^ (hash(score) & 0xFFFFFFFFFFFFFFFF)
+        move = (data >> 10) & 0xFF
+        if move:
+            move = ((move - 1) >> 4, (move - 1) & 0xF)
+        else:
+            move = None
+        return (key, data & 0xFF, (data >> 8) & 0x3, score, move,
+                (data >> 18) & 0xFFFF)
+
+    def probe(self, key):
+        """Return the entry stored for a position as a tuple (depth, flag,
+        score, move), or None if the position is not in the table.
+        """
+        self.probes += 1
+        slot = (key & self._mask) * self._slots
+        for slot in range(slot, slot + self._slots):
+            entry = self._read(slot)
+            if entry is not None and entry[0] == key:
+                self.hits += 1
+                return entry[1:5]
+        return None
+
+    def store(self, key, depth, flag, score, move):
+        """Record the result of searching a position to the given depth. """
+        slot = (key & self._mask) * self._slots
+        if self.replacement != "always":
+            entry = self._read(slot)
+            if (entry is not None and entry[0] != key and entry[1] > depth and
+                    entry[5] == self.age & 0xFFFF):
+                if self._slots == 1:
+                    return
+                slot += 1
+
+        data = (1 << 34) | ((self.age & 0xFFFF) << 18) | (flag << 8) | min(depth, 0xFF)
+        if move is not None:
+            data |= (((move[0] << 4) | move[1]) + 1) << 10
+        self._data[slot] = data
+        self._scores[slot] = score
+        self._checks[slot] = key ^ data ^ (hash(score) & 0xFFFFFFFFFFFFFFFF)
+
+
+class MoveOrdering:
+    """Move ordering stage for alpha-beta search. Moves are searched in the
+    order: the best move stored for the position (e.g., by the previous
+    iterative deepening iteration), the killer moves recorded for the current
+    ply, then the remaining moves by decreasing history score.
+
+    Subclasses can override `order()` and `record_cutoff()` to plug in other
+    ordering schemes.
+
+    Parameters
+    ----------
+    num_killers : int (optional)
+        The number of killer moves remembered for each ply.
+
+    rng : random.Random (optional)
+        If set, moves with equal history scores are ordered randomly using
+        this generator instead of keeping the move generation order.
+    """
+
+    def __init__(self, num_killers=2, rng=None):
+        self.num_killers = num_killers
+        self.rng = rng
+        self.killers = []
+        # history scores for the moves of the searching player (even plies)
+        # and of the opponent (odd plies)
+        self.history = ({}, {})
+
+    def new_search(self):
+        """Prepare for a search from a new root position. Killer moves are
+        indexed by ply from the root, so they are discarded; history scores are
+        halved so that recent cutoffs dominate.
+        """
+        self.killers = []
+        for history in self.history:
+            for move in history:
+                history[move] //= 2
+
+    def order(self, moves, ply, best_move=None):
+        """Return the input moves sorted in the order they should be searched.
+
+        Parameters
+        ----------
+        moves : list<(int, int)>
+            The legal moves at the current node.
+
+        ply : int
+            The distance of the current node from the root of the search.
+
+        best_move : (int, int) (optional)
+            The best move found for this position by an earlier search.
+
+        Returns
+        -------
+        list<(int, int)>
+            The ordered list of moves.
+        """
+        history = self.history[ply & 1]
+        if self.rng is None:
+            moves.sort(key=lambda move: history.get(move, 0), reverse=True)
+        else:
+            rng = self.rng
+            moves.sort(key=lambda move: (history.get(move, 0), rng.random()), reverse=True)
+        if ply < len(self.killers):
+            for killer in reversed(self.killers[ply]):
+                if killer in moves:
+                    moves.remove(killer)
+                    moves.insert(0, killer)
+        if best_move in moves:
+            moves.remove(best_move)
+            moves.insert(0, best_move)
+        return moves
+
+    def record_cutoff(self, move, ply, depth):
+        """Update the killer moves and history scores after `move` caused a
+        cutoff at a node `ply` plies from the root, searched to `depth`.
+        """
+        while len(self.killers) <= ply:
+            self.killers.append([])
+        killers = self.killers[ply]
+        if move not in killers:
+            killers.insert(0, move)
+            del killers[self.num_killers:]
+
+        history = self.history[ply & 1]
+        history[move] = history.get(move, 0) + depth * depth
+
+
+class EndgameSolver:
+    """Exact solver for positions where the players are partitioned (see
+    `isolation.Board.is_partitioned`). Once the players cannot reach a common
+    cell, the game reduces to two independent problems of finding the longest
+    knight walk through the open cells of each region, and the player with the
+    longer walk wins (the player to move wins only with a strictly longer
+    walk).
+
+    The longest walk is found by exhaustive search. Results are memoized by
+    (cell, region), where region is the bitmask of the open cells reachable
+    from the cell; the regions shrink and split as the walk proceeds, so
+    many branches share sub-results.
+
+    Parameters
+    ----------
+    max_entries : int (optional)
+        The maximum number of memoized results; the memo is cleared when it
+        is full.
+    """
+
+    def __init__(self, max_entries=2**18):
+        self.max_entries = max_entries
+        self.cache = {}
+        self.masks = None
+        self.time_left = None
+        self.threshold = 0.
+
+    def clear(self):
+        """Remove all memoized results. """
+        self.cache = {}
+
+    def solve(self, game, player, time_left=None, threshold=0.):
+        """Return the length of the longest walk available to the specified
+        player and the first move of that walk.
+
+        Parameters
+        ----------
+        game : `isolation.Board`
+            The current game state. The specified player must have moved.
+
+        player : object
+            A player instance in the current game.
+
+        time_left : callable (optional)
+            A function that returns the number of milliseconds left in the
+            current turn. If set, SearchTimeout is raised when it drops below
+            the threshold.
+
+        threshold : float (optional)
+            The number of milliseconds left at which the search is abandoned.
+
+        Returns
+        -------
+        (int, (int, int))
+            The number of moves in the longest walk and its first move, or
+            (0, (-1, -1)) if the player has no legal moves.
+        """
+        if game.knight_masks is not self.masks:
+            # memoized results are only valid for one board size
+            self.masks = game.knight_masks
+            self.clear()
+        self.time_left = time_left
+        self.threshold = threshold
+
+        r, c = game.get_player_location(player)
+        region = game.reachable_cells(player)
+        moves = self.masks[r + c * game.height] & region
+        bound = bin(region).count("1")
+        best_length, best_move = 0, (-1, -1)
+        while moves and best_length < bound:
+            low_bit = moves & -moves
+            moves ^= low_bit
+            idx = low_bit.bit_length() - 1
+            length = 1 + self._longest(idx, region ^ low_bit)
+            if length > best_length:
+                best_length = length
+                best_move = (idx % game.height, idx // game.height)
+        return best_length, best_move
+
+    def _region(self, loc, open_cells):
+        """Return the bitmask of the open cells reachable from cell loc. """
+        masks = self.masks
+        region = 0
+        frontier = masks[loc] & open_cells
+        while frontier:
+            region |= frontier
+            neighbours = 0
+            while frontier:
+                low_bit = frontier & -frontier
+                neighbours |= masks[low_bit.bit_length() - 1]
+                frontier ^= low_bit
+            frontier = neighbours & open_cells & ~region
+        return region
+
+    def _longest(self, loc, open_cells):
+        """Return the number of moves in the longest walk from cell loc
+        through the open cells.
+        """
+        if self.time_left is not None and self.time_left() < self.threshold:
+            raise SearchTimeout()
+
+        region = self._region(loc, open_cells)
+        key = (loc, region)
+        length = self.cache.get(key)
+        if length is not None:
+            return length
+
+        # a walk cannot be longer than the number of reachable cells
+        bound = bin(region).count("1")
+        length = 0
+        moves = self.masks[loc] & region
+        while moves and length < bound:
+            low_bit = moves & -moves
+            moves ^= low_bit
+            length = max(length, 1 + self._longest(low_bit.bit_length() - 1,
+                                                   region ^ low_bit))
+
+        if len(self.cache) >= self.max_entries:
+            self.cache.clear()
+        self.cache[key] = length
+        return length
+
+
+class TimeManager:
+    """Time management for iterative deepening search (see the
+    `time_manager` option of `AlphaBetaPlayer`).
+
+    The fixed TIMER_THRESHOLD of the player is replaced by a safety margin
+    calibrated on the host: the longest delay between consecutive calls to
+    time_left() is measured on the first move, and the margin grows whenever
+    unwinding a timed-out search uses too much of it.
+
+    After every completed iteration, the cost of the next one is predicted
+    from the last iteration time and the effective branching factor of the
+    previous iterations, and the search stops if the next iteration cannot
+    finish in the remaining time. The predictions are often off by a factor
+    of two either way, so an iteration is only skipped when its predicted
+    cost exceeds the remaining time by more than a factor `patience`, or by
+    more than a factor `extension` if the best move changed in the last
+    iteration. When an iteration times out, the player plays the best root
+    move it completed.
+
+    Parameters
+    ----------
+    min_margin : float (optional)
+        The smallest safety margin in milliseconds.
+
+    max_margin : float (optional)
+        The largest safety margin in milliseconds.
+
+    safety : float (optional)
+        The ratio between the safety margin and the longest delay measured
+        between two time checks, or between the time check that aborted a
+        search and the end of get_move().
+
+    patience : float (optional)
+        The factor by which the predicted cost of the next iteration may
+        exceed the remaining time when the best move is stable.
+
+    extension : float (optional)
+        The factor by which the predicted cost of the next iteration may
+        exceed the remaining time when the best move is unstable.
+
+    default_growth : float (optional)
+        The ratio between the node counts of consecutive iterations assumed
+        until two iterations have completed.
+
+    Attributes
+    ----------
+    margin : float or None
+        The safety margin in milliseconds; None until it is calibrated.
+    """
+
+    def __init__(self, min_margin=4., max_margin=30., safety=1.5, patience=2.,
+                 extension=4., default_growth=4.):
+        self.min_margin = min_margin
+        self.max_margin = max_margin
+        self.safety = safety
+        self.patience = patience
+        self.extension = extension
+        self.default_growth = default_growth
+        self.margin = None
+        self.time_left = None
+        self._last = 0.
+        self._times = []
+        self._nodes = []
+        self._moves = []
+
+    def calibrate(self, time_left, samples=100):
+        """Set the safety margin from the longest delay between consecutive
+        calls to time_left().
+        """
+        readings = [time_left() for _ in range(samples)]
+        delay = max(prev - curr for prev, curr in zip(readings, readings[1:]))
+        self.margin = min(self.max_margin, max(self.min_margin, self.safety * delay))
+
+    def start(self, time_left):
+        """Start timing the search of a new move. """
+        if self.margin is None:
+            self.calibrate(time_left)
+        self.time_left = time_left
+        self._last = time_left()
+        self._times = []
+        self._nodes = []
+        self._moves = []
+
+    def iteration_done(self, nodes, move):
+        """Record the number of nodes and the best move of a completed
+        iteration.
+        """
+        now = self.time_left()
+        self._times.append(self._last - now)
+        self._last = now
+        self._nodes.append(nodes)
+        self._moves.append(move)
+
+    def predict(self):
+        """Return the predicted number of milliseconds needed by the next
+        iteration.
+        """
+        nodes = self._nodes
+        if len(nodes) >= 3 and nodes[-3]:
+            # the node counts of alpha-beta alternate between odd and even
+            # depths, so average the growth over the last two iterations
+            growth = math.sqrt(nodes[-1] / nodes[-3])
+        elif len(nodes) == 2 and nodes[-2]:
+            growth = nodes[-1] / nodes[-2]
+        else:
+            growth = self.default_growth
+        return self._times[-1] * max(growth, 1.)
+
+    def unstable(self):
+        """Return True if the best move changed in the last iteration. """
+        return len(self._moves) >= 2 and self._moves[-1] != self._moves[-2]
+
+    def next_iteration(self):
+        """Return True if the next iteration should be started. """
+        if not self._times:
+            return True
+        remaining = self.time_left() - self.margin
+        return self.predict() <= remaining * (self.extension if self.unstable()
+                                              else self.patience)
+
+    def record_timeout(self, remaining):
+        """Grow the safety margin to `safety` times the time used to unwind
+        a search aborted by a timeout, given the number of milliseconds
+        remaining after the search was unwound.
+        """
+        used = self.margin - remaining
+        self.margin = min(self.max_margin, max(self.margin, self.safety * used))
+
+
+class SearchStats:
+    """Statistics of the search run by one call to `AlphaBetaPlayer.get_move`
+    (see the `collect_stats` option).
+
+    Attributes
+    ----------
+    nodes : dict
+        The number of nodes visited by each completed iterative deepening
+        iteration, keyed by search depth.
+
+    max_depth : int
+        The depth of the deepest completed iteration.
+
+    leaf_evaluations : int
+        The number of calls to the evaluation function.
+
+    cutoffs : int
+        The number of beta cutoffs.
+
+    cutoff_indices : dict
+        The number of cutoffs caused by the move at each index of the
+        (ordered) move list of a node; a high share at index 0 indicates good
+        move ordering.
+
+    score_time : float
+        The number of seconds spent in the evaluation function.
+
+    movegen_time : float
+        The number of seconds spent generating moves.
+
+    total_time : float
+        The number of seconds spent in get_move().
+    """
+
+    def __init__(self):
+        self.nodes = {}
+        self.max_depth = 0
+        self.leaf_evaluations = 0
+        self.cutoffs = 0
+        self.cutoff_indices = {}
+        self.score_time = 0.
+        self.movegen_time = 0.
+        self.total_time = 0.
+
+    def record_cutoff(self, index):
+        """Count a cutoff caused by the move at the specified index. """
+        self.cutoffs += 1
+        self.cutoff_indices[index] = self.cutoff_indices.get(index, 0) + 1
+
+    def branching_factor(self):
+        """Return the effective branching factor of the deepest completed
+        iteration: the ratio of its node count to that of the iteration
+        before it (None if fewer than two iterations completed).
+        """
+        depth = self.max_depth
+        if depth - 1 not in self.nodes or not self.nodes[depth - 1]:
+            return None
+        return self.nodes[depth] / self.nodes[depth - 1]
+
+    def as_dict(self):
+        """Return the statistics as a dict of JSON-compatible values. """
+        return {"nodes": {str(depth): count for depth, count in sorted(self.nodes.items())},
+                "max_depth": self.max_depth,
+                "branching_factor": self.branching_factor(),
+                "leaf_evaluations": self.leaf_evaluations,
+                "cutoffs": self.cutoffs,
+                "cutoff_indices": {str(index): count for index, count
+                                   in sorted(self.cutoff_indices.items())},
+                "score_time": self.score_time,
+                "movegen_time": self.movegen_time,
+                "total_time": self.total_time}
+
+    def to_json(self):
+        """Return the statistics as one line of JSON (without a newline). """
+        import json
+        return json.dumps(self.as_dict())
+
+
 class IsolationPlayer:
     """Base class for minimax and alphabeta agents -- this class is never
     constructed or tested directly.
@@ -213,14 +870,66 @@ class IsolationPlayer:
         Time remaining (in milliseconds) when search is aborted. Should be a
         positive value large enough to allow the function to return before the
         timer expires.
+
+    in_place : bool (optional)
+        If True, the search expands nodes with `game.push_move()` and
+        `game.pop_move()` on a single copy of the root board instead of
+        allocating a new board with `game.forecast_move()` at every node.
+
+    Reading the clock costs a noticeable fraction of the time spent at each
+    node, so the search nodes count down `_countdown` and only call
+    `_check_time()`, which reads time_left(), when it reaches zero. The
+    number of nodes between reads is tuned from the measured node rate so
+    that the reads are about CHECK_INTERVAL milliseconds apart, and at most
+    half of the time left before the threshold, so the reads get denser as
+    the deadline approaches. Assigning a new timer to `time_left` restarts
+    the tuning, and the first node searched with it always reads the clock.
     """
 
+    CHECK_INTERVAL = 1.  # target milliseconds between clock reads
+    MAX_CHECK_NODES = 4096  # largest number of nodes between clock reads
+
     # Increased timeout from 10ms to 15ms
-    def __init__(self, search_depth=3, score_fn=custom_score, timeout=15.):
+    def __init__(self, search_depth=3, score_fn=custom_score, timeout=15.,
+                 in_place=False):
         self.search_depth = search_depth
         self.score = score_fn
         self.time_left = None
         self.TIMER_THRESHOLD = timeout
+        self.in_place = in_place
+
+    @property
+    def time_left(self):
+        return self._time_left
+
+    @time_left.setter
+    def time_left(self, time_left):
+        self._time_left = time_left
+        self._countdown = 0
+        self._check_nodes = 1
+        self._last_remaining = None
+
+    def _check_time(self):
+        """Read the clock, raise SearchTimeout if the time left is below
+        TIMER_THRESHOLD, and set the number of nodes to search before the
+        next read.
+        """
+        remaining = self._time_left()
+        if remaining < self.TIMER_THRESHOLD:
+            raise SearchTimeout()
+
+        nodes = self._check_nodes
+        elapsed = (self._last_remaining - remaining
+                   if self._last_remaining is not None else 0.)
+        if elapsed > 0:
+            target = min(self.CHECK_INTERVAL, (remaining - self.TIMER_THRESHOLD) / 2)
+            # grow at most fourfold, as the rate measured over a few nodes
+            # is noisy
+            nodes = min(4 * nodes, int(nodes * target / elapsed))
+        else:
+            nodes *= 2
+        self._check_nodes = self._countdown = max(1, min(nodes, self.MAX_CHECK_NODES))
+        self._last_remaining = remaining
 
 
 class MinimaxPlayer(IsolationPlayer):
@@ -278,18 +987,16 @@ class MinimaxPlayer(IsolationPlayer):
         """ Return True if the game is over for the active player
         and False otherwise.
         """
-        if self.time_left() < self.TIMER_THRESHOLD:
-            raise SearchTimeout()
+        # only called from _minimax(), which checks the timer at every node
         return not bool(game.get_legal_moves())
 
     def cutoff_test(self, game, depth):
-        if self.time_left() < self.TIMER_THRESHOLD:
-            raise SearchTimeout()
         return depth == 0 or self.terminal_test(game)
 
     def _minimax(self, game, depth, maximizing_player=True):
-        if self.time_left() < self.TIMER_THRESHOLD:
-            raise SearchTimeout()
+        self._countdown -= 1
+        if self._countdown <= 0:
+            self._check_time()
 
         legal_moves = game.get_legal_moves()
 
@@ -304,15 +1011,25 @@ class MinimaxPlayer(IsolationPlayer):
         if maximizing_player:
             best_score = float("-inf")
             for move in legal_moves:
-                next_state = game.forecast_move(move)
-                score, _ = self._minimax(next_state, depth - 1, False)
+                if self.in_place:
+                    game.push_move(move)
+                    score, _ = self._minimax(game, depth - 1, False)
+                    game.pop_move()
+                else:
+                    next_state = game.forecast_move(move)
+                    score, _ = self._minimax(next_state, depth - 1, False)
                 if score > best_score:
                     best_score, best_move = score, move
         else:
             best_score = float("inf")
             for move in legal_moves:
-                next_state = game.forecast_move(move)
-                score, _ = self._minimax(next_state, depth - 1, True)
+                if self.in_place:
+                    game.push_move(move)
+                    score, _ = self._minimax(game, depth - 1, True)
+                    game.pop_move()
+                else:
+                    next_state = game.forecast_move(move)
+                    score, _ = self._minimax(next_state, depth - 1, True)
                 if score < best_score:
                     best_score, best_move = score, move
 
@@ -360,6 +1077,11 @@ class MinimaxPlayer(IsolationPlayer):
         if self.time_left() < self.TIMER_THRESHOLD:
             raise SearchTimeout()
 
+        # in-place search mutates the board, and a timeout can interrupt it
+        # anywhere in the tree, so work on a private copy of the root
+        if self.in_place:
+            game = game.copy()
+
         _, move = self._minimax(game, depth)
         return move
 
@@ -368,8 +1090,115 @@ class AlphaBetaPlayer(IsolationPlayer):
     """Game-playing agent that chooses a move using iterative deepening minimax
     search with alpha-beta pruning. You must finish and test this player to
     make sure it returns a good move before the search time limit expires.
+
+    Parameters
+    ----------
+    tt : TranspositionTable (optional)
+        A transposition table used to carry search results between iterative
+        deepening iterations and between turns. The board must provide a
+        `zobrist_key` attribute. No table is used if None.
+
+    move_ordering : MoveOrdering (optional)
+        The move ordering stage used to sort the moves at every node. Moves are
+        generated in a fixed order with `game.generate_moves()` and sorted by
+        the ordering stage. If None, moves are searched in the (shuffled)
+        order returned by `game.get_legal_moves()`.
+
+    pvs : bool (optional)
+        If True, use Principal Variation Search: only the first move at each
+        node is searched with the full window, and the remaining moves are
+        tested with a null window and re-searched if they turn out better.
+
+    aspiration : float (optional)
+        If set, every iterative deepening iteration after the first searches
+        the root with the window (score - aspiration, score + aspiration)
+        around the score of the previous iteration, and re-searches with a
+        widened window if the result falls outside of it.
+
+    endgame : EndgameSolver (optional)
+        If set, get_move() switches to this exact solver as soon as the
+        players are partitioned (see `isolation.Board.is_partitioned`) and
+        plays the first move of the longest walk. The solver may use up to
+        half of the time left; if it does not finish, the move is chosen by
+        the regular search.
+
+    rng : random.Random (optional)
+        The random number generator used to pick the fallback move at the
+        root. If None, the global `random` module is used.
+
+    time_manager : TimeManager (optional)
+        If set, the search uses the safety margin of the time manager instead
+        of TIMER_THRESHOLD, and get_move() stops deepening when the time
+        manager predicts that the next iteration will not finish. The search
+        also stops when the score of the root is a proven win or loss.
+
+    collect_stats : bool (optional)
+        If True, every call to get_move() records a `SearchStats` object in
+        `stats` and appends it to `stats_history`. Measuring the time spent
+        in the evaluation function and move generation slows the search
+        down; when False, the search runs without instrumentation.
+
+    trace : search_trace.TraceWriter (optional)
+        If set, every node of the search tree is written to this trace when
+        the search returns from it (see `search_trace`). The search methods
+        are only wrapped when a trace is given, so searches without a trace
+        run at full speed.
+
+    batch_score : callable (optional)
+        If set, the children of the nodes one ply above the horizon are
+        scored at once with `batch_score(game, moves, self)`, which must
+        return the list of `score_fn(game.forecast_move(move), self)` for the
+        moves (see `batch_eval.BatchScore`). The search results are the same
+        as without it; the leaves scored this way are not traced.
+
+    See `IsolationPlayer` for the remaining parameters.
+
+    Attributes
+    ----------
+    node_counts : dict
+        The number of nodes visited by each completed iteration of the last
+        call to get_move(), keyed by search depth.
+
+    root_moves : list<(int, int)> or None
+        If set, the search only considers these moves at the root (used to
+        split the root moves between processes).
+
+    stats : SearchStats or None
+        The statistics of the last call to get_move() if `collect_stats` is
+        set.
+
+    stats_history : list<SearchStats>
+        The statistics of every call to get_move() since the list was last
+        cleared, if `collect_stats` is set.
     """
 
+    def __init__(self, search_depth=3, score_fn=custom_score, timeout=15.,
+                 in_place=False, tt=None, move_ordering=None, pvs=False,
+                 aspiration=None, endgame=None, rng=None, time_manager=None,
+                 collect_stats=False, trace=None, batch_score=None):
+        super().__init__(search_depth, score_fn, timeout, in_place)
+        self.tt = tt
+        self.move_ordering = move_ordering
+        self.pvs = pvs
+        self.aspiration = aspiration
+        self.endgame = endgame
+        self.rng = rng if rng is not None else random
+        self.time_manager = time_manager
+        self.collect_stats = collect_stats
+        self.batch_score = batch_score
+        self.stats = None
+        self.stats_history = []
+        self._stats = None
+        self.nodes = 0
+        self.node_counts = {}
+        self.root_moves = None
+        self._root_depth = 0
+        self._prev_best = None
+        self._partial = None
+        self.trace = trace
+        if trace is not None:
+            self._trace_search()
+
     def get_move(self, game, time_left):
         """Search for the best move from the available legal moves and return a
         result before the time limit expires.
@@ -400,6 +1229,9 @@ class AlphaBetaPlayer(IsolationPlayer):
             Board coordinates corresponding to a legal move; may return
             (-1, -1) if there are no available legal moves.
         """
+        if self.collect_stats:
+            return self._get_move_with_stats(game, time_left)
+
         self.time_left = time_left
 
         moves = game.get_legal_moves()
@@ -410,63 +1242,370 @@ class AlphaBetaPlayer(IsolationPlayer):
         # in case the search fails due to timeout
         best_move = (-1, -1)
 
+        time_manager = self.time_manager
+        if time_manager is not None:
+            time_manager.start(time_left)
+            self.TIMER_THRESHOLD = time_manager.margin
+
+        if self.endgame is not None and game.is_partitioned():
+            try:
+                threshold = (time_left() + self.TIMER_THRESHOLD) / 2
+                return self.endgame.solve(game, self, time_left, threshold)[1]
+            except SearchTimeout:
+                pass
+
+        self.new_search()
+
         try:
             # The try/except block will automatically catch the exception
             # raised when the timer is about to expire.
             depth = 1
+            score = None
             while True:
-                best_move = self.alphabeta(game, depth)
+                score, best_move = self.search_iteration(game, depth, score)
+                if time_manager is not None:
+                    time_manager.iteration_done(self.node_counts[depth], best_move)
+                    if abs(score) == float("inf") or not time_manager.next_iteration():
+                        break
+                    # search the best move first, so that the best move of
+                    # an interrupted iteration can be used
+                    self._prev_best = best_move
                 depth += 1
 
         except SearchTimeout:
-            pass  # Handle any actions required after timeout as needed
+            if time_manager is not None:
+                time_manager.record_timeout(time_left())
+                if self._partial is not None:
+                    best_move = self._partial[1]
 
         # Return the best move from the last completed search iteration
         return best_move
 
-    def maximize(self, game, depth, alpha, beta):
-        if self.time_left() < self.TIMER_THRESHOLD:
-            raise SearchTimeout()
+    def _get_move_with_stats(self, game, time_left):
+        """Run get_move() with the evaluation function and move generation
+        wrapped in timers, and record its statistics in `stats`.
+        """
+        from timeit import default_timer
+
+        stats = self._stats = SearchStats()
+        score_fn = self.score
+        legal_moves = self._legal_moves
+
+        def timed_score(game, player):
+            start = default_timer()
+            try:
+                return score_fn(game, player)
+            finally:
+                stats.score_time += default_timer() - start
+                stats.leaf_evaluations += 1
+
+        def timed_legal_moves(game):
+            start = default_timer()
+            try:
+                return legal_moves(game)
+            finally:
+                stats.movegen_time += default_timer() - start
+
+        self.score = timed_score
+        self._legal_moves = timed_legal_moves
+        self.collect_stats = False
+        self.node_counts = {}
+        start = default_timer()
+        try:
+            return self.get_move(game, time_left)
+        finally:
+            stats.total_time = default_timer() - start
+            stats.nodes = dict(self.node_counts)
+            stats.max_depth = max(self.node_counts, default=0)
+            self.score = score_fn
+            del self._legal_moves
+            self.collect_stats = True
+            self._stats = None
+            self.stats = stats
+            self.stats_history.append(stats)
+
+    def _trace_search(self):
+        """Replace maximize(), minimize() and _alphabeta() with wrappers that
+        write every node they return from to `trace`.
+        """
+        from search_trace import ABORTED, CUTOFF, MAXIMIZING, ROOT
+
+        trace = self.trace
+        ply = [0]
+
+        def traced(search, flags):
+            def search_node(game, depth, alpha, beta):
+                # the move leading to a node is the location of the player
+                # who just moved
+                move = game.get_player_location(game.inactive_player)
+                node_ply = ply[0] = ply[0] + 1
+                try:
+                    value = search(game, depth, alpha, beta)
+                finally:
+                    ply[0] = node_ply - 1
+                if value >= beta if flags & MAXIMIZING else value <= alpha:
+                    trace.write_node(move, depth, node_ply, alpha, beta, value,
+                                     flags | CUTOFF)
+                else:
+                    trace.write_node(move, depth, node_ply, alpha, beta, value, flags)
+                return value
+            return search_node
+
+        root = self._alphabeta
+
+        def traced_root(game, depth, alpha=float("-inf"), beta=float("inf")):
+            ply[0] = 0
+            try:
+                score, move = root(game, depth, alpha, beta)
+            except SearchTimeout:
+                trace.write_node(None, depth, 0, alpha, beta, float("nan"),
+                                 ROOT | MAXIMIZING | ABORTED)
+                raise
+            flags = ROOT | MAXIMIZING | (CUTOFF if score >= beta else 0)
+            trace.write_node(move, depth, 0, alpha, beta, score, flags)
+            return score, move
+
+        self.maximize = traced(self.maximize, MAXIMIZING)
+        self.minimize = traced(self.minimize, 0)
+        self._alphabeta = traced_root
+
+    def new_search(self):
+        """Reset the per-move search state before searching a new root
+        position.
+        """
+        self.node_counts = {}
+        self._prev_best = None
+        self._partial = None
+        if self.tt is not None:
+            self.tt.new_search()
+        if self.move_ordering is not None:
+            self.move_ordering.new_search()
+
+    def search_iteration(self, game, depth, prev_score=None):
+        """Run one iterative deepening iteration to the specified depth and
+        record the number of nodes it visited in `node_counts`.
 
-        # print("BoardState MAXPlayer:\n" + game.to_string())
+        Parameters
+        ----------
+        game : isolation.Board
+            The current game state
 
-        moves = game.get_legal_moves()
+        depth : int
+            The depth of the iteration
 
+        prev_score : float (optional)
+            The score returned by the previous iteration; used to center the
+            aspiration window
+
+        Returns
+        -------
+        (float, (int, int))
+            The score of the root position and the best move found
+        """
+        self.nodes = 0
+        window = self.aspiration
+        if window is None or prev_score is None or abs(prev_score) == float("inf"):
+            score, move = self._alphabeta(game, depth)
+        else:
+            alpha, beta = prev_score - window, prev_score + window
+            score, move = self._alphabeta(game, depth, alpha, beta)
+            if score <= alpha:
+                score, move = self._alphabeta(game, depth, float("-inf"), beta)
+            elif score >= beta:
+                score, move = self._alphabeta(game, depth, alpha, float("inf"))
+        self.node_counts[depth] = self.nodes
+        return score, move
+
+    def maximize(self, game, depth, alpha, beta):
+        self._countdown -= 1
+        if self._countdown <= 0:
+            self._check_time()
+
+        self.nodes += 1
         if depth == 0:
             return self.score(game, self)
 
+        moves = self._legal_moves(game)
+
         if not moves:
             return self.score(game, self)
 
+        alpha_orig = alpha
+        tt_move = None
+        if self.tt is not None:
+            tt_score, tt_move = self._tt_lookup(game, depth, alpha, beta)
+            if tt_score is not None:
+                return tt_score
+        moves = self._order_moves(moves, depth, tt_move)
+
+        if depth == 1 and self.batch_score is not None:
+            score, best_move = self._batch_leaves(game, moves, alpha_orig, beta, True)
+            if self.tt is not None:
+                self._tt_store(game, depth, alpha_orig, beta, score, best_move)
+            return score
+
         score = float('-inf')
+        best_move = None
         for move in moves:
-            score = max(score, self.minimize(game.forecast_move(move), depth - 1, alpha, beta))
+            if self.in_place:
+                game.push_move(move)
+                child = game
+            else:
+                child = game.forecast_move(move)
+            if self.pvs and best_move is not None:
+                # null window test whether the move beats the current best;
+                # scores are floats, so the window is (alpha, next float up)
+                # rather than the ambiguous zero-width window (alpha, alpha)
+                value = self.minimize(child, depth - 1, alpha, math.nextafter(alpha, beta))
+                if alpha < value < beta:
+                    value = self.minimize(child, depth - 1, value, beta)
+            else:
+                value = self.minimize(child, depth - 1, alpha, beta)
+            if self.in_place:
+                game.pop_move()
+
+            if value > score:
+                score, best_move = value, move
             if score >= beta:
-                return score
+                if self.move_ordering is not None:
+                    self.move_ordering.record_cutoff(move, self._root_depth - depth, depth)
+                if self._stats is not None:
+                    self._stats.record_cutoff(moves.index(move))
+                break
             alpha = max(alpha, score)
+
+        if self.tt is not None:
+            self._tt_store(game, depth, alpha_orig, beta, score, best_move)
         return score
 
     def minimize(self, game, depth, alpha, beta):
-        if self.time_left() < self.TIMER_THRESHOLD:
-            raise SearchTimeout()
-
-        # print("BoardState MINPlayer:\n" + game.to_string())
-        moves = game.get_legal_moves()
+        self._countdown -= 1
+        if self._countdown <= 0:
+            self._check_time()
 
+        self.nodes += 1
         if depth == 0:
             return self.score(game, self)
 
+        moves = self._legal_moves(game)
+
         if not moves:
             return self.score(game, self)
 
+        beta_orig = beta
+        tt_move = None
+        if self.tt is not None:
+            tt_score, tt_move = self._tt_lookup(game, depth, alpha, beta)
+            if tt_score is not None:
+                return tt_score
+        moves = self._order_moves(moves, depth, tt_move)
+
+        if depth == 1 and self.batch_score is not None:
+            score, best_move = self._batch_leaves(game, moves, alpha, beta_orig, False)
+            if self.tt is not None:
+                self._tt_store(game, depth, alpha, beta_orig, score, best_move)
+            return score
+
         score = float('inf')
+        best_move = None
         for move in moves:
-            score = min(score, self.maximize(game.forecast_move(move), depth - 1, alpha, beta))
+            if self.in_place:
+                game.push_move(move)
+                child = game
+            else:
+                child = game.forecast_move(move)
+            if self.pvs and best_move is not None:
+                # null window test whether the move beats the current best
+                value = self.maximize(child, depth - 1, math.nextafter(beta, alpha), beta)
+                if alpha < value < beta:
+                    value = self.maximize(child, depth - 1, alpha, value)
+            else:
+                value = self.maximize(child, depth - 1, alpha, beta)
+            if self.in_place:
+                game.pop_move()
+
+            if value < score:
+                score, best_move = value, move
             if score <= alpha:
-                return score
+                if self.move_ordering is not None:
+                    self.move_ordering.record_cutoff(move, self._root_depth - depth, depth)
+                if self._stats is not None:
+                    self._stats.record_cutoff(moves.index(move))
+                break
             beta = min(beta, score)
+
+        if self.tt is not None:
+            self._tt_store(game, depth, alpha, beta_orig, score, best_move)
         return score
 
+    def _batch_leaves(self, game, moves, alpha, beta, maximizing):
+        """Score the children of a node at depth 1 with batch_score and return
+        (score, best_move) as the loop of maximize() or minimize() would.
+        """
+        values = self.batch_score(game, moves, self)
+        self.nodes += len(values)
+        score = float('-inf') if maximizing else float('inf')
+        best_move = None
+        for move, value in zip(moves, values):
+            if value > score if maximizing else value < score:
+                score, best_move = value, move
+            if score >= beta if maximizing else score <= alpha:
+                if self.move_ordering is not None:
+                    self.move_ordering.record_cutoff(move, self._root_depth - 1, 1)
+                if self._stats is not None:
+                    self._stats.record_cutoff(moves.index(move))
+                break
+        return score, best_move
+
+    def _legal_moves(self, game):
+        """Return the legal moves of the active player; in a fixed order if
+        a move ordering stage will sort them, shuffled otherwise.
+        """
+        if self.move_ordering is not None:
+            return game.generate_moves()
+        return game.get_legal_moves()
+
+    def _order_moves(self, moves, depth, best_move):
+        """Return the moves of a node searched to `depth` in the order they
+        should be searched, trying `best_move` first.
+        """
+        if self.move_ordering is not None:
+            return self.move_ordering.order(moves, self._root_depth - depth, best_move)
+        if best_move in moves and moves[0] != best_move:
+            moves.remove(best_move)
+            moves.insert(0, best_move)
+        return moves
+
+    def _tt_lookup(self, game, depth, alpha, beta):
+        """Probe the transposition table for the current position. Return a
+        tuple (score, move) holding the stored score if it was searched deep
+        enough to settle the node for the (alpha, beta) window (None
+        otherwise), and the stored best move (None if the position was not
+        found).
+        """
+        entry = self.tt.probe(game.zobrist_key)
+        if entry is None:
+            return None, None
+
+        entry_depth, flag, score, move = entry
+        if entry_depth >= depth and (flag == EXACT or
+                                     (flag == LOWER and score >= beta) or
+                                     (flag == UPPER and score <= alpha)):
+            return score, move
+        return None, move
+
+    def _tt_store(self, game, depth, alpha, beta, score, move):
+        """Record the score of a node searched with the (alpha, beta) window
+        in the transposition table.
+        """
+        if score <= alpha:
+            flag = UPPER
+        elif score >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self.tt.store(game.zobrist_key, depth, flag, score, move)
+
     def alphabeta(self, game, depth, alpha=float("-inf"), beta=float("inf")):
         """Implement depth-limited minimax search with alpha-beta pruning as
         described in the lectures.
@@ -512,34 +1651,679 @@ class AlphaBetaPlayer(IsolationPlayer):
                 each helper function or else your agent will timeout during
                 testing.
         """
+        _, move = self._alphabeta(game, depth, alpha, beta)
+        return move
+
+    def _alphabeta(self, game, depth, alpha=float("-inf"), beta=float("inf")):
+        """Search the root position to the specified depth with the (alpha,
+        beta) window. Return a tuple (score, move) holding the score of the
+        position and the best move found; (-1, -1) if there are no legal
+        moves.
+        """
         if self.time_left() < self.TIMER_THRESHOLD:
             raise SearchTimeout()
 
-        moves = game.get_legal_moves()
+        self.nodes += 1
+        moves = self._legal_moves(game)
+        if self.root_moves is not None:
+            moves = [move for move in moves if move in self.root_moves]
 
         if not moves:
-            return self.score(game, self)
+            return self.score(game, self), (-1, -1)
 
         if depth == 0:
-            return self.score(game, self)
+            return self.score(game, self), (-1, -1)
 
         best_score = float("-inf")
-        best_move = random.choice(moves)
+        best_move = self.rng.choice(moves)
         score = float("-inf")
+        alpha_orig = alpha
+        tt_move = None
+        if self.tt is not None:
+            _, tt_move = self._tt_lookup(game, depth, alpha, beta)
+        if tt_move is None:
+            tt_move = self._prev_best
+        self._root_depth = depth
+        self._partial = None
+        moves = self._order_moves(moves, depth, tt_move)
+
+        # in-place search mutates the board, and a timeout can interrupt it
+        # anywhere in the tree, so work on a private copy of the root
+        if self.in_place:
+            game = game.copy()
 
-        global corner_positions
-        corner_positions = [(0, 0), (0, game.height - 1), (game.width - 1, 0), (game.width - 1, game.height - 1)]
-
-        for move in game.get_legal_moves():
-            score = max(score, self.minimize(game.forecast_move(move), depth - 1, alpha, beta))
+        for move in moves:
+            if self.in_place:
+                game.push_move(move)
+                child = game
+            else:
+                child = game.forecast_move(move)
+            if self.pvs and best_score > float("-inf"):
+                # null window test whether the move beats the current best
+                value = self.minimize(child, depth - 1, alpha, math.nextafter(alpha, beta))
+                if alpha < value < beta:
+                    value = self.minimize(child, depth - 1, value, beta)
+            else:
+                value = self.minimize(child, depth - 1, alpha, beta)
+            if self.in_place:
+                game.pop_move()
+
+            score = max(score, value)
             alpha = max(alpha, score)
             if score > best_score:
                 best_score = score
                 best_move = move
-                # print("\n\nBoardState BestScore:\n" + game.to_string())
-                # print("BoardState score: " + str(score))
-                # print(str.format("BoardState move: [{},{}]", move[0], move[1]))
-                # print("BoardState alpha: " + str(alpha))
-                # print("BoardState beta: " + str(beta))
+                if score > alpha_orig:
+                    # the best move so far is known to improve on the window
+                    self._partial = (best_score, best_move)
+            if score >= beta:
+                if self._stats is not None:
+                    self._stats.record_cutoff(moves.index(move))
+                break
+
+        if self.tt is not None:
+            self._tt_store(game, depth, alpha_orig, beta, best_score, best_move)
+        return best_score, best_move
+
+
+class MCTSPlayer(IsolationPlayer):
+    """Game-playing agent that chooses a move using Monte Carlo Tree Search
+    with UCT selection and uniformly random playouts.
+
+    The search works on a compact integer encoding of the position (a bitmask
+    of the blocked cells and the cell index of each player, see
+    `isolation.Board.snapshot`), so neither the tree nor the playouts copy
+    board objects. The tree is stored in parallel arrays indexed by node
+    number, and the subtree below the opponent's reply is kept between
+    turns.
+
+    Parameters
+    ----------
+    exploration : float (optional)
+        The exploration constant of the UCT formula.
+
+    max_nodes : int (optional)
+        The maximum number of nodes in the tree. Once the tree is full, new
+        playouts start from the leaves without expanding them; a tree that is
+        more than half full is discarded instead of being reused on the next
+        turn.
+
+    rng : random.Random (optional)
+        The random number generator used by the playouts.
+
+    timeout : float (optional)
+        Time remaining (in milliseconds) when search is aborted.
+
+    Attributes
+    ----------
+    playouts : int
+        The number of playouts run by the last call to get_move().
+
+    total_playouts : int
+        The number of playouts run by all calls to get_move().
+
+    total_time : float
+        The number of seconds spent in all calls to get_move().
+    """
+
+    def __init__(self, exploration=math.sqrt(2), max_nodes=2**18, rng=None,
+                 timeout=15.):
+        super().__init__(timeout=timeout)
+        self.exploration = exploration
+        self.max_nodes = max_nodes
+        self.rng = rng if rng is not None else random.Random()
+        self.playouts = 0
+        self.total_playouts = 0
+        self.total_time = 0.
+        self._masks = None
+        self._move_cache = None
+        self._full = 0
+        self._root = None
+        self._root_state = None
+        self._new_tree()
+
+    def _new_tree(self):
+        """Discard the search tree. For every node, the arrays hold the cell
+        index of the move leading to it, its parent, the index of its first
+        child (-1 until the node is expanded; the children of a node are
+        stored consecutively), its number of children, the number of playouts
+        through it won by the player who moved into it, and its number of
+        playouts.
+        """
+        self._move = array("l")
+        self._parent = array("l")
+        self._first_child = array("l")
+        self._num_children = array("l")
+        self._wins = array("l")
+        self._visits = array("l")
+
+    def _add_node(self, move, parent):
+        """Append an unexpanded node to the tree and return its index. """
+        self._move.append(move)
+        self._parent.append(parent)
+        self._first_child.append(-1)
+        self._num_children.append(0)
+        self._wins.append(0)
+        self._visits.append(0)
+        return len(self._move) - 1
+
+    def get_move(self, game, time_left):
+        """Search for the best move from the available legal moves and return a
+        result before the time limit expires.
+
+        Parameters
+        ----------
+        game : `isolation.Board`
+            An instance of `isolation.Board` encoding the current state of the
+            game (e.g., player locations and blocked cells).
+
+        time_left : callable
+            A function that returns the number of milliseconds left in the
+            current turn. Returning with any less than 0 ms remaining forfeits
+            the game.
+
+        Returns
+        -------
+        (int, int)
+            Board coordinates corresponding to a legal move; may return
+            (-1, -1) if there are no available legal moves.
+        """
+        self.time_left = time_left
+        start = time_left()
+
+        width, height, blocked, p1_loc, p2_loc, side, _, _ = game.snapshot()
+        locs = [p1_loc, p2_loc]
+        if game.knight_masks is not self._masks:
+            self._masks = game.knight_masks
+            self._move_cache = tuple({} for _ in self._masks)
+            self._full = (1 << (width * height)) - 1
+            self._root = None
+
+        moves = self._moves(blocked, locs[side])
+        if not moves:
+            return -1, -1
+
+        root = self._reuse_root(blocked, locs, side)
+        if root is None:
+            self._new_tree()
+            root = self._add_node(-1, -1)
+
+        self.playouts = 0
+        while time_left() > self.TIMER_THRESHOLD:
+            self._iterate(root, blocked, locs[:], side)
+            self.playouts += 1
+        self.total_playouts += self.playouts
+        self.total_time += (start - time_left()) / 1000.
+
+        if self._first_child[root] == -1:
+            # no playout finished in time
+            return moves[0] % height, moves[0] // height
+
+        # keep the subtree of the chosen move for the next turn
+        first = self._first_child[root]
+        children = range(first, first + self._num_children[root])
+        best = max(children, key=self._visits.__getitem__)
+        move = self._move[best]
+        locs[side] = move
+        self._root = best
+        self._root_state = (blocked | (1 << move), locs, side ^ 1)
+        return move % height, move // height
+
+    def _reuse_root(self, blocked, locs, side):
+        """Return the node of the current position in the tree kept from the
+        previous turn, or None if the position is not in the tree.
+        """
+        old_root, state = self._root, self._root_state
+        self._root = self._root_state = None
+        if (old_root is None or state[2] == side or
+                2 * len(self._move) > self.max_nodes):
+            return None
+
+        old_blocked, old_locs, _ = state
+        move = locs[side ^ 1]
+        if (move is None or blocked != old_blocked | (1 << move) or
+                locs[side] != old_locs[side]):
+            return None
+
+        first = self._first_child[old_root]
+        if first == -1:
+            return None
+        for child in range(first, first + self._num_children[old_root]):
+            if self._move[child] == move:
+                return child
+        return None
+
+    def _moves(self, blocked, loc):
+        """Return a sequence of the cell indices a player at cell index loc
+        can move to (any open cell if loc is None).
+        """
+        if loc is None:
+            open_cells = self._full & ~blocked
+            return [idx for idx in range(len(self._masks))
+                    if (open_cells >> idx) & 1]
+
+        open_mask = self._masks[loc] & ~blocked
+        cache = self._move_cache[loc]
+        moves = cache.get(open_mask)
+        if moves is None:
+            moves = []
+            mask = open_mask
+            while mask:
+                low_bit = mask & -mask
+                moves.append(low_bit.bit_length() - 1)
+                mask ^= low_bit
+            moves = cache[open_mask] = tuple(moves)
+        return moves
+
+    def _iterate(self, root, blocked, locs, side):
+        """Run one selection, expansion, playout and backpropagation step from
+        the root position (blocked, locs, side).
+        """
+        move_of, first_child = self._move, self._first_child
+        num_children, wins, visits = self._num_children, self._wins, self._visits
+        c = self.exploration
+
+        # selection: unvisited children first, then by UCT value
+        node = root
+        while first_child[node] != -1 and num_children[node]:
+            first = first_child[node]
+            log_visits = math.log(visits[node])
+            best_value = -1.
+            for child in range(first, first + num_children[node]):
+                n = visits[child]
+                if not n:
+                    node = child
+                    break
+                value = wins[child] / n + c * math.sqrt(log_visits / n)
+                if value > best_value:
+                    best_value, node = value, child
+            blocked |= 1 << move_of[node]
+            locs[side] = move_of[node]
+            side ^= 1
+
+        # expansion: add all the children of the leaf and step into one
+        if first_child[node] == -1 and len(move_of) < self.max_nodes:
+            moves = self._moves(blocked, locs[side])
+            first_child[node] = len(move_of)
+            num_children[node] = len(moves)
+            for move in moves:
+                self._add_node(move, node)
+            if moves:
+                node = first_child[node] + self.rng.randrange(len(moves))
+                blocked |= 1 << move_of[node]
+                locs[side] = move_of[node]
+                side ^= 1
+
+        # playout; `side` is the player to move at the leaf
+        winner = self._playout(blocked, locs, side)
+
+        # backpropagation; each node counts the wins of the player who moved
+        # into it, who is the opponent of the player to move at the node
+        parent = self._parent
+        mover = side ^ 1
+        while node != -1:
+            visits[node] += 1
+            if winner == mover:
+                wins[node] += 1
+            mover ^= 1
+            node = parent[node] if node != root else -1
+
+    def _playout(self, blocked, locs, side):
+        """Play random moves from the position (blocked, locs, side) until one
+        player cannot move, and return the index (0 or 1) of the winner.
+        """
+        choice = self.rng.choice
+        moves_from = self._moves
+        while True:
+            moves = moves_from(blocked, locs[side])
+            if not moves:
+                return side ^ 1
+            move = choice(moves)
+            blocked |= 1 << move
+            locs[side] = move
+            side ^= 1
+
+
+def _lazy_smp_worker(worker_id, tt, jobs, results, score_fn, options):
+    """Main loop of a LazySMPPlayer helper process. Each job sent to the
+    `jobs` queue is a tuple (job_id, snapshot, deadline, age); the helper runs
+    iterative deepening on the position until the deadline (an absolute time
+    of `timeit.default_timer()`), and reports every completed iteration to
+    the `results` queue as a tuple (job_id, depth, score, move).
+    """
+    from timeit import default_timer
+    from isolation import BitBoard
+
+    player = AlphaBetaPlayer(score_fn=score_fn, timeout=0., in_place=True, tt=tt,
+                             move_ordering=MoveOrdering(rng=random.Random(worker_id)),
+                             **options)
+    opponent = "opponent"
+
+    while True:
+        job = jobs.get()
+        if job is None:
+            return
+        job_id, snapshot, deadline, age = job
+
+        if snapshot[5]:
+            game = BitBoard.from_snapshot(snapshot, opponent, player)
+        else:
+            game = BitBoard.from_snapshot(snapshot, player, opponent)
+        player.new_search()
+        tt.age = age
+        player.time_left = lambda: 1000 * (deadline - default_timer())
+
+        # helpers start at staggered depths so that they fill the shared
+        # table with different parts of the tree than the main process
+        depth = 1 + worker_id % 2
+        max_depth = len(game.get_blank_spaces())
+        score = None
+        try:
+            while depth <= max_depth and abs(score or 0) != float("inf"):
+                score, move = player.search_iteration(game, depth, score)
+                results.put((job_id, depth, score, move))
+                depth += 1
+        except SearchTimeout:
+            pass
+
+
+class LazySMPPlayer(AlphaBetaPlayer):
+    """Game-playing agent that runs iterative deepening alpha-beta search in
+    several processes at once (Lazy SMP). Helper processes search the same
+    root position as the main process at staggered depths and with varied
+    move orders, sharing results through a transposition table in shared
+    memory. The move returned is the best move of the deepest iteration
+    completed by any process.
+
+    The helper processes are started on the first call to get_move() and
+    kept running across moves until close() is called, so process start-up
+    costs are paid only once.
+
+    Parameters
+    ----------
+    workers : int (optional)
+        The number of helper processes. Defaults to one less than the number
+        of CPUs.
+
+    tt_entries : int (optional)
+        The size of the shared transposition table.
+
+    See `AlphaBetaPlayer` for the remaining parameters.
+    """
+
+    def __init__(self, search_depth=3, score_fn=custom_score, timeout=15.,
+                 workers=None, tt_entries=2 ** 18, pvs=True, aspiration=None):
+        from multiprocessing import cpu_count
+
+        super().__init__(search_depth, score_fn, timeout, in_place=True,
+                         tt=SharedTranspositionTable(tt_entries),
+                         move_ordering=MoveOrdering(), pvs=pvs,
+                         aspiration=aspiration)
+        self.workers = max(1, cpu_count() - 1) if workers is None else workers
+        self._processes = []
+        self._jobs = None
+        self._results = None
+        self._job_id = 0
+
+    def _start_workers(self):
+        """Start the helper processes. """
+        from multiprocessing import Process, Queue
+
+        self._jobs = Queue()
+        self._results = Queue()
+        options = {"pvs": self.pvs, "aspiration": self.aspiration}
+        for worker_id in range(1, self.workers + 1):
+            process = Process(target=_lazy_smp_worker,
+                              args=(worker_id, self.tt, self._jobs, self._results,
+                                    self.score, options))
+            process.daemon = True
+            process.start()
+            self._processes.append(process)
+
+    def close(self):
+        """Stop the helper processes. """
+        for _ in self._processes:
+            self._jobs.put(None)
+        for process in self._processes:
+            process.join()
+        self._processes = []
+
+    def get_move(self, game, time_left):
+        """Search for the best move from the available legal moves and return a
+        result before the time limit expires.
+
+        Parameters
+        ----------
+        game : `isolation.Board`
+            An instance of `isolation.Board` encoding the current state of the
+            game (e.g., player locations and blocked cells).
+
+        time_left : callable
+            A function that returns the number of milliseconds left in the
+            current turn. Returning with any less than 0 ms remaining forfeits
+            the game.
+
+        Returns
+        -------
+        (int, int)
+            Board coordinates corresponding to a legal move; may return
+            (-1, -1) if there are no available legal moves.
+        """
+        from queue import Empty
+        from timeit import default_timer
+
+        self.time_left = time_left
+
+        moves = game.get_legal_moves()
+        if not moves:
+            return -1, -1
+
+        if not self._processes:
+            self._start_workers()
+
+        self.new_search()
+        self._job_id += 1
+        deadline = default_timer() + (time_left() - self.TIMER_THRESHOLD) / 1000.
+        job = (self._job_id, game.snapshot(), deadline, self.tt.age)
+        for _ in self._processes:
+            self._jobs.put(job)
+
+        best_depth, best_move = 0, moves[0]
+        try:
+            depth = 1
+            score = None
+            while True:
+                score, best_move = self.search_iteration(game, depth, score)
+                best_depth = depth
+                depth += 1
+
+        except SearchTimeout:
+            pass
+
+        # take the deepest iteration completed by any of the processes
+        while True:
+            try:
+                job_id, depth, _, move = self._results.get_nowait()
+            except Empty:
+                break
+            if job_id == self._job_id and depth > best_depth and move in moves:
+                best_depth, best_move = depth, move
+
+        return best_move
+
+
+# The search agent of a ParallelAlphaBetaPlayer pool process
+_pool_player = None
+
+
+def _init_root_split_worker(score_fn, options):
+    """Initialize a ParallelAlphaBetaPlayer pool process. The search agent
+    and its transposition table persist across moves.
+    """
+    global _pool_player
+    _pool_player = AlphaBetaPlayer(score_fn=score_fn, timeout=0., in_place=True,
+                                   tt=TranspositionTable(), move_ordering=MoveOrdering(),
+                                   **options)
+
+
+def _root_split_search(snapshot, root_moves, deadline):
+    """Run iterative deepening on a subset of the root moves of the position
+    encoded by `snapshot` until the deadline (an absolute time of
+    `timeit.default_timer()`). Return a list of tuples (depth, score, move)
+    for every completed iteration.
+    """
+    from timeit import default_timer
+    from isolation import BitBoard
+
+    player = _pool_player
+    opponent = "opponent"
+    if snapshot[5]:
+        game = BitBoard.from_snapshot(snapshot, opponent, player)
+    else:
+        game = BitBoard.from_snapshot(snapshot, player, opponent)
+    player.root_moves = root_moves
+    player.time_left = lambda: 1000 * (deadline - default_timer())
+    player.new_search()
+
+    results = []
+    max_depth = len(game.get_blank_spaces())
+    try:
+        depth = 1
+        score = None
+        while depth <= max_depth:
+            score, move = player.search_iteration(game, depth, score)
+            results.append((depth, score, move))
+            if abs(score) == float("inf"):
+                break
+            depth += 1
+    except SearchTimeout:
+        pass
+    return results
+
+
+def _merge_root_results(results):
+    """Merge the iteration results returned by `_root_split_search` for each
+    subset of the root moves. Return a tuple (depth, score, move) for the
+    deepest iteration completed for every subset, or None if there is none.
+    A subset whose search ended with a proven win or loss keeps its last
+    result at greater depths.
+    """
+    results = [chunk for chunk in results if chunk]
+    if not results:
+        return None
+
+    best = None
+    for depth in range(1, max(chunk[-1][0] for chunk in results) + 1):
+        iteration = []
+        for chunk in results:
+            if depth <= chunk[-1][0]:
+                iteration.append(chunk[depth - 1])
+            elif abs(chunk[-1][1]) == float("inf"):
+                iteration.append(chunk[-1])
+            else:
+                return best
+        _, score, move = max(iteration, key=lambda result: result[1])
+        best = (depth, score, move)
+    return best
+
+
+class ParallelAlphaBetaPlayer(AlphaBetaPlayer):
+    """Game-playing agent that splits the root moves between the processes
+    of a persistent process pool. Each process runs iterative deepening
+    alpha-beta search on its share of the moves until the deadline, and the
+    results of the deepest iteration completed by every process are merged.
+
+    Positions are sent to the pool as compact board snapshots (see
+    `isolation.Board.snapshot`), and the pool is started on the first call to
+    get_move() and kept until close() is called.
+
+    Parameters
+    ----------
+    processes : int (optional)
+        The number of pool processes. Defaults to the number of CPUs.
+
+    ipc_margin : float (optional)
+        Time (in milliseconds) reserved for returning the results from the
+        pool processes to the main process.
+
+    See `AlphaBetaPlayer` for the remaining parameters.
+
+    Attributes
+    ----------
+    depth_reached : int
+        The depth of the merged iteration used by the last call to get_move().
+    """
+
+    def __init__(self, search_depth=3, score_fn=custom_score, timeout=15.,
+                 processes=None, ipc_margin=5., pvs=True, aspiration=None):
+        from multiprocessing import cpu_count
+
+        super().__init__(search_depth, score_fn, timeout, pvs=pvs,
+                         aspiration=aspiration)
+        self.processes = cpu_count() if processes is None else processes
+        self.ipc_margin = ipc_margin
+        self.depth_reached = 0
+        self._pool = None
+
+    def close(self):
+        """Stop the pool processes. """
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+
+    def get_move(self, game, time_left):
+        """Search for the best move from the available legal moves and return a
+        result before the time limit expires.
+
+        Parameters
+        ----------
+        game : `isolation.Board`
+            An instance of `isolation.Board` encoding the current state of the
+            game (e.g., player locations and blocked cells).
+
+        time_left : callable
+            A function that returns the number of milliseconds left in the
+            current turn. Returning with any less than 0 ms remaining forfeits
+            the game.
+
+        Returns
+        -------
+        (int, int)
+            Board coordinates corresponding to a legal move; may return
+            (-1, -1) if there are no available legal moves.
+        """
+        from multiprocessing import Pool, TimeoutError
+        from timeit import default_timer
+
+        self.time_left = time_left
+        self.depth_reached = 0
+
+        moves = game.get_legal_moves()
+        if not moves:
+            return -1, -1
 
+        if self._pool is None:
+            options = {"pvs": self.pvs, "aspiration": self.aspiration}
+            self._pool = Pool(self.processes, initializer=_init_root_split_worker,
+                              initargs=(self.score, options))
+
+        deadline = default_timer() + (time_left() - self.TIMER_THRESHOLD) / 1000.
+        worker_deadline = deadline - self.ipc_margin / 1000.
+        snapshot = game.snapshot()
+        pending = [self._pool.apply_async(_root_split_search,
+                                          (snapshot, moves[i::self.processes], worker_deadline))
+                   for i in range(min(self.processes, len(moves)))]
+
+        results = []
+        for result in pending:
+            try:
+                results.append(result.get(max(0., deadline - default_timer())))
+            except TimeoutError:
+                results.append([])
+
+        best = _merge_root_results(results)
+        if best is None:
+            return moves[0]
+        self.depth_reached, _, best_move = best
         return best_move
@@ -0,0 +1,335 @@
+"""
+This file contains the `BitBoard` class, an alternative engine for the game
+Isolation that stores the blocked cells and player positions as integer
+bitmasks instead of a list of cells.
+
+`BitBoard` is a drop-in replacement for `isolation.Board`: it exposes the same
+public methods, so agents and tournament code can use either engine without
+changes. Cell indices follow the `Board` convention (`row + col * height`),
+and the knight moves available from every square are precomputed once per
+board size.
+"""
+from .geometry import board_geometry
+from .isolation import Board, _zobrist_tables
+
+
+class BitBoard(Board):
+    """Implement a model for the game Isolation assuming each player moves like
+    a knight in chess, storing the game state as integer bitmasks.
+
+    Unlike `Board`, the move lists returned by `get_legal_moves()` are not
+    shuffled; they are listed in order of increasing cell index.
+
+    Parameters
+    ----------
+    player_1 : object
+        An object with a get_move() function. This is the only function
+        directly called by the Board class for each player.
+
+    player_2 : object
+        An object with a get_move() function. This is the only function
+        directly called by the Board class for each player.
+
+    width : int (optional)
+        The number of columns that the board should have.
+
+    height : int (optional)
+        The number of rows that the board should have.
+
+    rng : random.Random (optional)
+        Accepted for compatibility with `Board`; the moves of a BitBoard are
+        never shuffled.
+    """
+
+    def __init__(self, player_1, player_2, width=7, height=7, rng=None):
+        self.width = width
+        self.height = height
+        self.move_count = 0
+        self._player_1 = player_1
+        self._player_2 = player_2
+        self._active_player = player_1
+        self._inactive_player = player_2
+
+        # Blocked cells (including the cells occupied by the players) are set
+        # bits of _blocked; player locations are cell indices or NOT_MOVED
+        self._blocked = 0
+        self._p1_loc = Board.NOT_MOVED
+        self._p2_loc = Board.NOT_MOVED
+        self._undo_stack = []
+        self._zobrist = _zobrist_tables(width, height)
+        self._key = 0
+        self._full = (1 << (width * height)) - 1
+        self._geometry = board_geometry(width, height)
+        self._masks = self._geometry.knight_masks
+        self._coords = self._geometry.coords
+        self._move_cache = self._geometry.move_cache
+        self._rng = rng
+
+    @classmethod
+    def from_board(cls, board):
+        """Return a BitBoard encoding the same game state as the input
+        `isolation.Board` instance.
+        """
+        new_board = cls(board._player_1, board._player_2,
+                        width=board.width, height=board.height)
+        for move in board.get_blank_spaces():
+            new_board._blocked |= 1 << (move[0] + move[1] * board.height)
+        new_board._blocked ^= new_board._full
+        new_board._p1_loc = board._board_state[-1]
+        new_board._p2_loc = board._board_state[-2]
+        new_board.move_count = board.move_count
+        new_board._key = board._key
+        new_board._active_player = board._active_player
+        new_board._inactive_player = board._inactive_player
+        return new_board
+
+    def snapshot(self):
+        """Return a compact, picklable encoding of the game state (see
+        `isolation.Board.snapshot`).
+        """
+        return (self.width, self.height, self._blocked, self._p1_loc,
+                self._p2_loc, int(self._active_player == self._player_2),
+                self.move_count, self._key)
+
+    @classmethod
+    def from_snapshot(cls, snapshot, player_1, player_2):
+        """Return a new board with the game state encoded by snapshot() and
+        the specified players.
+        """
+        width, height, blocked, p1_loc, p2_loc, p2_to_move, move_count, key = snapshot
+        new_board = cls(player_1, player_2, width=width, height=height)
+        new_board._blocked = blocked
+        new_board._p1_loc = p1_loc
+        new_board._p2_loc = p2_loc
+        if p2_to_move:
+            new_board._active_player, new_board._inactive_player = player_2, player_1
+        new_board.move_count = move_count
+        new_board._key = key
+        return new_board
+
+    def _blocked_cells(self):
+        return self._blocked
+
+    @property
+    def _board_state(self):
+        """The game state in the list layout used by `isolation.Board`."""
+        state = [(self._blocked >> idx) & 1
+                 for idx in range(self.width * self.height)]
+        state += [int(self._active_player == self._player_2),
+                  self._p2_loc, self._p1_loc]
+        return state
+
+    def hash(self):
+        return self._key
+
+    def copy(self):
+        """ Return a deep copy of the current board. """
+        new_board = BitBoard.__new__(BitBoard)
+        new_board.__dict__.update(self.__dict__)
+        new_board._undo_stack = []
+        return new_board
+
+    def move_is_legal(self, move):
+        """Test whether a move is legal in the current game state.
+
+        Parameters
+        ----------
+        move : (int, int)
+            A coordinate pair (row, column) indicating the next position for
+            the active player on the board.
+
+        Returns
+        -------
+        bool
+            Returns True if the move is legal, False otherwise
+        """
+        return (0 <= move[0] < self.height and 0 <= move[1] < self.width and
+                not (self._blocked >> (move[0] + move[1] * self.height)) & 1)
+
+    def get_blank_spaces(self):
+        """Return a list of the locations that are still available on the board.
+        """
+        coords = self._coords
+        open_cells = self._full & ~self._blocked
+        return [coords[idx] for idx in range(len(coords))
+                if (open_cells >> idx) & 1]
+
+    def _location(self, player):
+        """Return the cell index of the specified player, or NOT_MOVED."""
+        if player == self._player_1:
+            return self._p1_loc
+        elif player == self._player_2:
+            return self._p2_loc
+        raise RuntimeError(
+            "Invalid player in get_player_location: {}".format(player))
+
+    def get_player_location(self, player):
+        """Find the current location of the specified player on the board.
+
+        Parameters
+        ----------
+        player : object
+            An object registered as a player in the current game.
+
+        Returns
+        -------
+        (int, int) or None
+            The coordinate pair (row, column) of the input player, or None
+            if the player has not moved.
+        """
+        idx = self._location(player)
+        if idx == Board.NOT_MOVED:
+            return Board.NOT_MOVED
+        return self._coords[idx]
+
+    def get_legal_moves(self, player=None):
+        """Return the list of all legal moves for the specified player.
+
+        Parameters
+        ----------
+        player : object (optional)
+            An object registered as a player in the current game. If None,
+            return the legal moves for the active player on the board.
+
+        Returns
+        -------
+        list<(int, int)>
+            The list of coordinate pairs (row, column) of all legal moves
+            for the player constrained by the current game state.
+        """
+        if player is None:
+            player = self._active_player
+        loc = self._location(player)
+        if loc == Board.NOT_MOVED:
+            return self.get_blank_spaces()
+
+        open_mask = self._masks[loc] & ~self._blocked
+        cache = self._move_cache[loc]
+        moves = cache.get(open_mask)
+        if moves is None:
+            coords = self._coords
+            mask = open_mask
+            moves = []
+            while mask:
+                low_bit = mask & -mask
+                moves.append(coords[low_bit.bit_length() - 1])
+                mask ^= low_bit
+            moves = cache[open_mask] = tuple(moves)
+        return list(moves)
+
+    # moves are never shuffled, so the fixed-order generator is the same
+    generate_moves = get_legal_moves
+
+    def apply_move(self, move):
+        """Move the active player to a specified location.
+
+        Parameters
+        ----------
+        move : (int, int)
+            A coordinate pair (row, column) indicating the next position for
+            the active player on the board.
+        """
+        idx = move[0] + move[1] * self.height
+        zobrist = self._zobrist
+        if self._active_player == self._player_2:
+            prev_idx, self._p2_loc = self._p2_loc, idx
+            player_keys = zobrist[2]
+        else:
+            prev_idx, self._p1_loc = self._p1_loc, idx
+            player_keys = zobrist[1]
+        self._key ^= zobrist[0][idx] ^ player_keys[idx] ^ zobrist[3]
+        if prev_idx != Board.NOT_MOVED:
+            self._key ^= player_keys[prev_idx]
+        self._blocked |= 1 << idx
+        self._active_player, self._inactive_player = self._inactive_player, self._active_player
+        self.move_count += 1
+
+    def push_move(self, move):
+        """Apply a move in-place and record how to undo it with pop_move().
+        """
+        if self._active_player == self._player_2:
+            self._undo_stack.append(self._p2_loc)
+        else:
+            self._undo_stack.append(self._p1_loc)
+        self.apply_move(move)
+
+    def pop_move(self):
+        """Undo the most recent move applied with push_move(). """
+        zobrist = self._zobrist
+        prev_idx = self._undo_stack.pop()
+        if self._inactive_player == self._player_2:
+            idx, self._p2_loc = self._p2_loc, prev_idx
+            player_keys = zobrist[2]
+        else:
+            idx, self._p1_loc = self._p1_loc, prev_idx
+            player_keys = zobrist[1]
+        self._key ^= zobrist[0][idx] ^ player_keys[idx] ^ zobrist[3]
+        if prev_idx != Board.NOT_MOVED:
+            self._key ^= player_keys[prev_idx]
+        self._blocked ^= 1 << idx
+        self._active_player, self._inactive_player = self._inactive_player, self._active_player
+        self.move_count -= 1
+
+    def mobility(self, player):
+        """Return the number of legal moves of the specified player, without
+        generating them.
+        """
+        loc = self._location(player)
+        if loc == Board.NOT_MOVED:
+            return bin(self._full & ~self._blocked).count("1")
+        return bin(self._masks[loc] & ~self._blocked).count("1")
+
+    def _has_moves(self, player):
+        """Return True if the specified player has at least one legal move."""
+        loc = self._location(player)
+        if loc == Board.NOT_MOVED:
+            return self._blocked != self._full
+        return bool(self._masks[loc] & ~self._blocked)
+
+    def is_winner(self, player):
+        """ Test whether the specified player has won the game. """
+        return player == self._inactive_player and not self._has_moves(self._active_player)
+
+    def is_loser(self, player):
+        """ Test whether the specified player has lost the game. """
+        return player == self._active_player and not self._has_moves(self._active_player)
+
+    def utility(self, player):
+        """Returns the utility of the current game state from the perspective
+        of the specified player (see `isolation.Board.utility`).
+        """
+        if not self._has_moves(self._active_player):
+
+            if player == self._inactive_player:
+                return float("inf")
+
+            if player == self._active_player:
+                return float("-inf")
+
+        return 0.
+
+    def to_string(self, symbols=['1', '2']):
+        """Generate a string representation of the current game state, marking
+        the location of each player and indicating which cells have been
+        blocked, and which remain open.
+        """
+        col_margin = len(str(self.height - 1)) + 1
+        prefix = "{:<" + "{}".format(col_margin) + "}"
+        offset = " " * (col_margin + 3)
+        out = offset + '   '.join(map(str, range(self.width))) + '\n\r'
+        for i in range(self.height):
+            out += prefix.format(i) + ' | '
+            for j in range(self.width):
+                idx = i + j * self.height
+                if not (self._blocked >> idx) & 1:
+                    out += ' '
+                elif self._p1_loc == idx:
+                    out += symbols[0]
+                elif self._p2_loc == idx:
+                    out += symbols[1]
+                else:
+                    out += '-'
+                out += ' | '
+            out += '\n\r'
+
+        return out
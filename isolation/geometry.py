@@ -0,0 +1,111 @@
+"""
+This file contains the `Geometry` class, which holds the precomputed geometry
+of an Isolation board of one size: the knight moves available from every
+square, the distance of every square to the center of the board, the corners,
+and the conversions between cell indices (`row + col * height`) and (row,
+column) pairs.
+
+The geometry only depends on the board size, so it is built once per size by
+`board_geometry()` and shared by every board of that size (see
+`isolation.Board.geometry`). Move generation and heuristics read it instead
+of recomputing the same values at every node.
+"""
+
+# Knight move offsets (row, column), in the order moves are generated
+DIRECTIONS = ((-2, -1), (-2, 1), (-1, -2), (-1, 2),
+              (1, -2), (1, 2), (2, -1), (2, 1))
+
+# Geometries shared by every board of the same (width, height)
+_GEOMETRIES = {}
+
+
+def board_geometry(width, height):
+    """Return the `Geometry` of a board of the specified size, building it on
+    first use.
+    """
+    geometry = _GEOMETRIES.get((width, height))
+    if geometry is None:
+        geometry = _GEOMETRIES[(width, height)] = Geometry(width, height)
+    return geometry
+
+
+class Geometry:
+    """Precomputed geometry of an Isolation board of one size. Use
+    `board_geometry()` to get the instance shared by all boards of a size.
+
+    All per-cell tables are tuples indexed by cell index (`row + col *
+    height`).
+
+    Parameters
+    ----------
+    width : int
+        The number of columns of the board.
+
+    height : int
+        The number of rows of the board.
+
+    Attributes
+    ----------
+    coords : tuple<(int, int)>
+        The (row, column) pair of each cell.
+
+    indices : dict
+        The cell index of each (row, column) pair on the board.
+
+    neighbours : tuple<tuple<(int, (int, int))>>
+        The cells a knight on each cell can move to on an empty board, as
+        (index, (row, column)) pairs in the order of DIRECTIONS.
+
+    neighbour_indices : tuple<tuple<int>>
+        The indices of the cells in `neighbours`.
+
+    neighbour_counts : tuple<int>
+        The number of cells in `neighbours`.
+
+    knight_masks : tuple<int>
+        The bitmask of the cells a knight on each cell can move to on an empty
+        board (bit i set for cell i).
+
+    center_distances : tuple<float>
+        The squared distance between each cell and the center of the board,
+        measured as in `sample_players.center_score`.
+
+    is_corner : tuple<bool>
+        Whether each cell is a corner of the board.
+
+    corners : tuple<(int, int)>
+        The (row, column) pairs of the corners of the board.
+
+    move_cache : tuple<dict>
+        One dict per cell mapping a mask of the open neighbours of the cell to
+        the tuple of the corresponding moves; filled lazily by `BitBoard`.
+    """
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.coords = tuple((idx % height, idx // height)
+                            for idx in range(width * height))
+        self.indices = {move: idx for idx, move in enumerate(self.coords)}
+
+        neighbours = []
+        for r, c in self.coords:
+            neighbours.append(tuple(
+                ((r + dr) + (c + dc) * height, (r + dr, c + dc))
+                for dr, dc in DIRECTIONS
+                if 0 <= r + dr < height and 0 <= c + dc < width))
+        self.neighbours = tuple(neighbours)
+        self.neighbour_indices = tuple(tuple(idx for idx, _ in moves)
+                                       for moves in self.neighbours)
+        self.neighbour_counts = tuple(len(moves) for moves in self.neighbours)
+        self.knight_masks = tuple(sum(1 << idx for idx, _ in moves)
+                                  for moves in self.neighbours)
+
+        self.center_distances = tuple((height / 2. - r) ** 2 + (width / 2. - c) ** 2
+                                      for r, c in self.coords)
+        self.corners = ((0, 0), (0, width - 1), (height - 1, 0),
+                        (height - 1, width - 1))
+        self.is_corner = tuple(move in self.corners for move in self.coords)
+
+        # the dicts hold at most 2^8 entries each
+        self.move_cache = tuple({} for _ in self.coords)
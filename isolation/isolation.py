@@ -11,8 +11,50 @@ import random
 import timeit
 from copy import copy
 
+from .geometry import board_geometry
+
 TIME_LIMIT_MILLIS = 150
 
+# Zobrist keys shared by every board of the same (width, height)
+_ZOBRIST_TABLES = {}
+
+
+def _zobrist_tables(width, height):
+    """Return the 64-bit Zobrist keys for a board of the specified size as a
+    tuple (blocked_keys, player_1_keys, player_2_keys, side_key). The per-cell
+    key lists are indexed like the board cells, and the player key lists sit
+    at positions 1 and 2 to match the last-move slots of `Board._board_state`.
+    The keys are generated from a fixed seed, so they are identical across
+    processes and runs.
+    """
+    tables = _ZOBRIST_TABLES.get((width, height))
+    if tables is None:
+        rng = random.Random("zobrist-{}x{}".format(width, height))
+        cells = range(width * height)
+        tables = ([rng.getrandbits(64) for _ in cells],
+                  [rng.getrandbits(64) for _ in cells],
+                  [rng.getrandbits(64) for _ in cells],
+                  rng.getrandbits(64))
+        _ZOBRIST_TABLES[(width, height)] = tables
+    return tables
+
+
+def _flood_fill(masks, loc, open_cells):
+    """Return a bitmask of the cells in open_cells that a knight at cell index
+    loc can reach by any sequence of moves through open cells.
+    """
+    region = 0
+    frontier = masks[loc] & open_cells
+    while frontier:
+        region |= frontier
+        neighbours = 0
+        while frontier:
+            low_bit = frontier & -frontier
+            neighbours |= masks[low_bit.bit_length() - 1]
+            frontier ^= low_bit
+        frontier = neighbours & open_cells & ~region
+    return region
+
 
 class Board(object):
     """Implement a model for the game Isolation assuming each player moves like
@@ -33,11 +75,15 @@ class Board(object):
 
     height : int (optional)
         The number of rows that the board should have.
+
+    rng : random.Random (optional)
+        The random number generator used to shuffle the legal moves. Copies
+        of the board share it. If None, the global `random` module is used.
     """
     BLANK = 0
     NOT_MOVED = None
 
-    def __init__(self, player_1, player_2, width=7, height=7):
+    def __init__(self, player_1, player_2, width=7, height=7, rng=None):
         self.width = width
         self.height = height
         self.move_count = 0
@@ -52,8 +98,32 @@ class Board(object):
         self._board_state[-1] = Board.NOT_MOVED
         self._board_state[-2] = Board.NOT_MOVED
 
+        # Previous locations of the moving players, one entry per move made
+        # with push_move(), so that pop_move() can restore them
+        self._undo_stack = []
+
+        # Zobrist key of the empty board with player 1 to move; updated
+        # incrementally by every move
+        self._zobrist = _zobrist_tables(width, height)
+        self._key = 0
+
+        self._geometry = board_geometry(width, height)
+        self._rng = rng if rng is not None else random
+
+        # The number of open knight neighbours of every cell, updated by
+        # every move, so that the mobility of a player is a single lookup
+        self._open_counts = list(self._geometry.neighbour_counts)
+
     def hash(self):
-        return str(self._board_state).__hash__()
+        return self._key
+
+    @property
+    def zobrist_key(self):
+        """A 64-bit Zobrist key of the current game state covering the blocked
+        cells, both player locations and the player holding initiative.
+        Positions reached through different move orders share the same key.
+        """
+        return self._key
 
     @property
     def active_player(self):
@@ -92,13 +162,67 @@ class Board(object):
 
     def copy(self):
         """ Return a deep copy of the current board. """
-        new_board = Board(self._player_1, self._player_2, width=self.width, height=self.height)
+        new_board = Board(self._player_1, self._player_2, width=self.width,
+                          height=self.height, rng=self._rng)
         new_board.move_count = self.move_count
         new_board._active_player = self._active_player
         new_board._inactive_player = self._inactive_player
         new_board._board_state = copy(self._board_state)
+        new_board._open_counts = self._open_counts[:]
+        new_board._key = self._key
         return new_board
 
+    def snapshot(self):
+        """Return a compact, picklable encoding of the game state that does not
+        reference the player objects, for sending positions to other processes.
+
+        Returns
+        -------
+        tuple
+            A tuple of integers (width, height, blocked, player_1_location,
+            player_2_location, player_2_to_move, move_count, zobrist_key),
+            where `blocked` is a bitmask of the blocked cells (bit i set if
+            cell i is blocked) and the locations are cell indices or None.
+        """
+        return (self.width, self.height, self._blocked_cells(),
+                self._board_state[-1], self._board_state[-2],
+                self._board_state[-3], self.move_count, self._key)
+
+    def _blocked_cells(self):
+        """Return a bitmask of the blocked cells (bit i set if cell i is
+        blocked).
+        """
+        blocked = 0
+        for idx in range(self.width * self.height):
+            if self._board_state[idx]:
+                blocked |= 1 << idx
+        return blocked
+
+    @classmethod
+    def from_snapshot(cls, snapshot, player_1, player_2):
+        """Return a new board with the game state encoded by snapshot() and
+        the specified players.
+        """
+        width, height, blocked, p1_loc, p2_loc, p2_to_move, move_count, key = snapshot
+        new_board = cls(player_1, player_2, width=width, height=height)
+        for idx in range(width * height):
+            new_board._board_state[idx] = (blocked >> idx) & 1
+        new_board._board_state[-1] = p1_loc
+        new_board._board_state[-2] = p2_loc
+        new_board._board_state[-3] = p2_to_move
+        if p2_to_move:
+            new_board._active_player, new_board._inactive_player = player_2, player_1
+        new_board.move_count = move_count
+        new_board._key = key
+        new_board._count_open_neighbours()
+        return new_board
+
+    def _count_open_neighbours(self):
+        """Recount the open neighbours of every cell from the board state. """
+        state = self._board_state
+        self._open_counts = [sum(state[idx] == Board.BLANK for idx in neighbours)
+                             for neighbours in self._geometry.neighbour_indices]
+
     def forecast_move(self, move):
         """Return a deep copy of the current game with an input move applied to
         advance the game one ply.
@@ -139,8 +263,9 @@ class Board(object):
     def get_blank_spaces(self):
         """Return a list of the locations that are still available on the board.
         """
-        return [(i, j) for j in range(self.width) for i in range(self.height)
-                if self._board_state[i + j * self.height] == Board.BLANK]
+        state = self._board_state
+        return [move for idx, move in enumerate(self._geometry.coords)
+                if state[idx] == Board.BLANK]
 
     def get_player_location(self, player):
         """Find the current location of the specified player on the board.
@@ -190,6 +315,66 @@ class Board(object):
             player = self.active_player
         return self.__get_moves(self.get_player_location(player))
 
+    def generate_moves(self, player=None):
+        """Return the list of all legal moves for the specified player in a
+        fixed order. Unlike get_legal_moves(), the list is not shuffled, so
+        searches that order moves themselves get deterministic results
+        without paying for the shuffle.
+
+        Parameters
+        ----------
+        player : object (optional)
+            An object registered as a player in the current game. If None,
+            return the legal moves for the active player on the board.
+
+        Returns
+        -------
+        list<(int, int)>
+            The list of coordinate pairs (row, column) of all legal moves
+            for the player constrained by the current game state.
+        """
+        if player is None:
+            player = self.active_player
+        return self.__generate_moves(self.get_player_location(player))
+
+    @property
+    def geometry(self):
+        """The `isolation.geometry.Geometry` of the board size, shared by all
+        boards of the same size.
+        """
+        return self._geometry
+
+    @property
+    def knight_masks(self):
+        """A tuple, indexed by cell, of bitmasks of the cells a knight on each
+        cell can move to on an empty board. The tuple is shared by all boards
+        of the same size.
+        """
+        return self._geometry.knight_masks
+
+    def reachable_cells(self, player):
+        """Return a bitmask of the open cells the specified player can reach
+        by any sequence of moves, ignoring the moves of the opponent (bit i is
+        set if cell i is reachable). A player that has not moved can reach
+        every open cell.
+        """
+        idx = self.get_player_location(player)
+        open_cells = ((1 << (self.width * self.height)) - 1) & ~self._blocked_cells()
+        if idx == Board.NOT_MOVED:
+            return open_cells
+        return _flood_fill(self.knight_masks, idx[0] + idx[1] * self.height, open_cells)
+
+    def is_partitioned(self):
+        """Return True if both players have moved and no open cell can be
+        reached by both of them. From then on the players cannot interact, and
+        each one simply makes the longest walk available in its own region.
+        """
+        if (self.get_player_location(self._player_1) == Board.NOT_MOVED or
+                self.get_player_location(self._player_2) == Board.NOT_MOVED):
+            return False
+        return not (self.reachable_cells(self._player_1) &
+                    self.reachable_cells(self._player_2))
+
     def apply_move(self, move):
         """Move the active player to a specified location.
 
@@ -201,19 +386,86 @@ class Board(object):
         """
         idx = move[0] + move[1] * self.height
         last_move_idx = int(self.active_player == self._player_2) + 1
+        prev_idx = self._board_state[-last_move_idx]
+        player_keys = self._zobrist[last_move_idx]
+        self._key ^= self._zobrist[0][idx] ^ player_keys[idx] ^ self._zobrist[3]
+        if prev_idx != Board.NOT_MOVED:
+            self._key ^= player_keys[prev_idx]
         self._board_state[-last_move_idx] = idx
         self._board_state[idx] = 1
         self._board_state[-3] ^= 1
+        counts = self._open_counts
+        for neighbour in self._geometry.neighbour_indices[idx]:
+            counts[neighbour] -= 1
         self._active_player, self._inactive_player = self._inactive_player, self._active_player
         self.move_count += 1
 
+    def push_move(self, move):
+        """Apply a move in-place and record how to undo it. Unlike
+        forecast_move(), no new board is allocated; every call must be matched
+        by a call to pop_move() to restore the previous state.
+
+        Parameters
+        ----------
+        move : (int, int)
+            A coordinate pair (row, column) indicating the next position for
+            the active player on the board.
+        """
+        last_move_idx = int(self._active_player == self._player_2) + 1
+        self._undo_stack.append(self._board_state[-last_move_idx])
+        self.apply_move(move)
+
+    def pop_move(self):
+        """Undo the most recent move applied with push_move(). """
+        # the player who made the move is the inactive player now
+        last_move_idx = int(self._inactive_player == self._player_2) + 1
+        idx = self._board_state[-last_move_idx]
+        prev_idx = self._undo_stack.pop()
+        player_keys = self._zobrist[last_move_idx]
+        self._key ^= self._zobrist[0][idx] ^ player_keys[idx] ^ self._zobrist[3]
+        if prev_idx != Board.NOT_MOVED:
+            self._key ^= player_keys[prev_idx]
+        self._board_state[idx] = Board.BLANK
+        self._board_state[-last_move_idx] = prev_idx
+        self._board_state[-3] ^= 1
+        counts = self._open_counts
+        for neighbour in self._geometry.neighbour_indices[idx]:
+            counts[neighbour] += 1
+        self._active_player, self._inactive_player = self._inactive_player, self._active_player
+        self.move_count -= 1
+
+    def mobility(self, player):
+        """Return the number of legal moves of the specified player, without
+        generating them.
+
+        Parameters
+        ----------
+        player : object
+            An object registered as a player in the current game.
+
+        Returns
+        -------
+        int
+            The number of legal moves, i.e., len(game.get_legal_moves(player))
+        """
+        if player == self._player_1:
+            idx = self._board_state[-1]
+        elif player == self._player_2:
+            idx = self._board_state[-2]
+        else:
+            raise RuntimeError(
+                "Invalid player in mobility: {}".format(player))
+        if idx == Board.NOT_MOVED:
+            return len(self.get_blank_spaces())
+        return self._open_counts[idx]
+
     def is_winner(self, player):
         """ Test whether the specified player has won the game. """
-        return player == self._inactive_player and not self.get_legal_moves(self._active_player)
+        return player == self._inactive_player and not self.mobility(self._active_player)
 
     def is_loser(self, player):
         """ Test whether the specified player has lost the game. """
-        return player == self._active_player and not self.get_legal_moves(self._active_player)
+        return player == self._active_player and not self.mobility(self._active_player)
 
     def utility(self, player):
         """Returns the utility of the current game state from the perspective
@@ -237,7 +489,7 @@ class Board(object):
             a value of -inf if the player has lost, and a value of 0
             otherwise.
         """
-        if not self.get_legal_moves(self._active_player):
+        if not self.mobility(self._active_player):
 
             if player == self._inactive_player:
                 return float("inf")
@@ -254,14 +506,21 @@ class Board(object):
         if loc == Board.NOT_MOVED:
             return self.get_blank_spaces()
 
-        r, c = loc
-        directions = [(-2, -1), (-2, 1), (-1, -2), (-1, 2),
-                      (1, -2), (1, 2), (2, -1), (2, 1)]
-        valid_moves = [(r + dr, c + dc) for dr, dc in directions
-                       if self.move_is_legal((r + dr, c + dc))]
-        random.shuffle(valid_moves)
+        valid_moves = self.__generate_moves(loc)
+        self._rng.shuffle(valid_moves)
         return valid_moves
 
+    def __generate_moves(self, loc):
+        """Generate the list of possible moves for an L-shaped motion (like a
+        knight in chess) in a fixed order.
+        """
+        if loc == Board.NOT_MOVED:
+            return self.get_blank_spaces()
+
+        state = self._board_state
+        return [move for idx, move in self._geometry.neighbours[loc[0] + loc[1] * self.height]
+                if state[idx] == Board.BLANK]
+
     def print_board(self):
         """DEPRECATED - use Board.to_string()"""
         return self.to_string()
@@ -310,9 +569,11 @@ class Board(object):
         (player, list<[(int, int),]>, str)
             Return multiple including the winning player, the complete game
             move history, and a string indicating the reason for losing
-            (e.g., timeout or invalid move).
+            (e.g., timeout or invalid move). The number of milliseconds used
+            by each call to get_move() is stored in the `move_times` list.
         """
         move_history = []
+        self.move_times = []
 
         time_millis = lambda: 1000 * timeit.default_timer()
 
@@ -325,6 +586,7 @@ class Board(object):
             time_left = lambda : time_limit - (time_millis() - move_start)
             curr_move = self._active_player.get_move(game_copy, time_left)
             move_end = time_left()
+            self.move_times.append(time_limit - move_end)
 
             if curr_move is None:
                 curr_move = Board.NOT_MOVED
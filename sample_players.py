@@ -65,7 +65,7 @@ def open_move_score(game, player):
     if game.is_winner(player):
         return float("inf")
 
-    return float(len(game.get_legal_moves(player)))
+    return float(game.mobility(player))
 
 
 def improved_score(game, player):
@@ -95,8 +95,8 @@ def improved_score(game, player):
     if game.is_winner(player):
         return float("inf")
 
-    own_moves = len(game.get_legal_moves(player))
-    opp_moves = len(game.get_legal_moves(game.get_opponent(player)))
+    own_moves = game.mobility(player)
+    opp_moves = game.mobility(game.get_opponent(player))
     return float(own_moves - opp_moves)
 
 
@@ -128,13 +128,22 @@ def center_score(game, player):
     if game.is_winner(player):
         return float("inf")
 
-    w, h = game.width / 2., game.height / 2.
-    y, x = game.get_player_location(player)
-    return float((h - y)**2 + (w - x)**2)
+    geometry = game.geometry
+    return geometry.center_distances[geometry.indices[game.get_player_location(player)]]
 
 
 class RandomPlayer():
-    """Player that chooses a move randomly."""
+    """Player that chooses a move randomly.
+
+    Parameters
+    ----------
+    rng : random.Random (optional)
+        The random number generator used to choose the moves. If None, the
+        global `random` module is used.
+    """
+
+    def __init__(self, rng=None):
+        self.rng = rng
 
     def get_move(self, game, time_left):
         """Randomly select a move from the available legal moves.
@@ -159,6 +168,8 @@ class RandomPlayer():
         legal_moves = game.get_legal_moves()
         if not legal_moves:
             return (-1, -1)
+        if self.rng is not None:
+            return legal_moves[self.rng.randint(0, len(legal_moves) - 1)]
         return legal_moves[randint(0, len(legal_moves) - 1)]
 
 
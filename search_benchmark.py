@@ -0,0 +1,133 @@
+"""Measure the number of nodes AlphaBetaPlayer visits at each iterative
+deepening depth with different combinations of search options.
+
+Every configuration searches the same set of random mid-game positions on a
+7x7 board to a fixed depth, so the node counts show how much each option
+reduces the size of the search tree.
+
+    python search_benchmark.py [max_depth]
+
+With --parallel, report instead the average depth ParallelAlphaBetaPlayer
+completes within the time limit with 1, 2, 4 and 8 pool processes.
+
+    python search_benchmark.py --parallel
+"""
+import random
+import sys
+import timeit
+
+from isolation import BitBoard
+from sample_players import improved_score
+from game_agent import (AlphaBetaPlayer, MoveOrdering, ParallelAlphaBetaPlayer,
+                        TranspositionTable)
+
+NUM_POSITIONS = 20  # number of random positions searched by each configuration
+MAX_DEPTH = 8  # default maximum iterative deepening depth
+TIME_LIMIT = 150  # number of milliseconds per move for the parallel benchmark
+PROCESSES = [1, 2, 4, 8]  # pool sizes compared by the parallel benchmark
+
+# Each configuration is a name and a function returning fresh player options
+CONFIGS = [
+    ("Alpha-beta", lambda: {}),
+    ("+TT", lambda: {"tt": TranspositionTable()}),
+    ("+Ordering", lambda: {"tt": TranspositionTable(),
+                           "move_ordering": MoveOrdering()}),
+    ("+PVS", lambda: {"tt": TranspositionTable(),
+                      "move_ordering": MoveOrdering(), "pvs": True}),
+    ("+Aspiration", lambda: {"tt": TranspositionTable(),
+                             "move_ordering": MoveOrdering(), "pvs": True,
+                             "aspiration": 1.}),
+]
+
+
+def random_positions(num_positions, seed=0):
+    """Return a list of move histories leading to random positions between
+    the opening and the middle game with player 1 to move.
+    """
+    rng = random.Random(seed)
+    histories = []
+    while len(histories) < num_positions:
+        game = BitBoard("Player1", "Player2")
+        history = []
+        for _ in range(2 * rng.randint(1, 8)):
+            moves = game.get_legal_moves()
+            if not moves:
+                break
+            history.append(rng.choice(moves))
+            game.apply_move(history[-1])
+        if game.get_legal_moves() and len(history) % 2 == 0:
+            histories.append(history)
+    return histories
+
+
+def count_nodes(options, history, max_depth):
+    """Search the position reached by the move history with iterative
+    deepening up to max_depth and return the nodes visited per depth.
+    """
+    player = AlphaBetaPlayer(score_fn=improved_score, **options)
+    player.time_left = lambda: float("inf")
+    game = BitBoard(player, "Player2")
+    for move in history:
+        game.apply_move(move)
+
+    player.new_search()
+    score = None
+    for depth in range(1, max_depth + 1):
+        score, _ = player.search_iteration(game, depth, score)
+    return player.node_counts
+
+
+def main(max_depth=MAX_DEPTH):
+    histories = random_positions(NUM_POSITIONS)
+
+    print("Nodes visited per depth ({} positions)\n".format(len(histories)))
+    print("{:<13}".format("Config") +
+          ''.join("{:>9}".format(d) for d in range(1, max_depth + 1)) +
+          "{:>10}".format("Time (s)"))
+
+    for name, make_options in CONFIGS:
+        totals = [0] * max_depth
+        start = timeit.default_timer()
+        for history in histories:
+            counts = count_nodes(make_options(), history, max_depth)
+            for depth, nodes in counts.items():
+                totals[depth - 1] += nodes
+        elapsed = timeit.default_timer() - start
+        print("{:<13}".format(name) +
+              ''.join("{:>9}".format(n) for n in totals) +
+              "{:>10.2f}".format(elapsed))
+
+
+def parallel_scaling(processes=PROCESSES, time_limit=TIME_LIMIT):
+    """Print the average depth completed per move by ParallelAlphaBetaPlayer
+    within the time limit for each number of pool processes.
+    """
+    histories = random_positions(NUM_POSITIONS)
+
+    print("Average depth completed in {} ms ({} positions)\n".format(
+        time_limit, len(histories)))
+    print("{:>10}{:>8}".format("Processes", "Depth"))
+
+    for num_processes in processes:
+        player = ParallelAlphaBetaPlayer(score_fn=improved_score,
+                                         processes=num_processes)
+        depths = []
+        try:
+            for history in histories:
+                game = BitBoard(player, "Player2")
+                for move in history:
+                    game.apply_move(move)
+                start = timeit.default_timer()
+                time_left = lambda: time_limit - 1000 * (timeit.default_timer() - start)
+                player.get_move(game, time_left)
+                depths.append(player.depth_reached)
+        finally:
+            player.close()
+        print("{:>10}{:>8.2f}".format(num_processes, sum(depths) / len(depths)))
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] == ["--parallel"]:
+        parallel_scaling()
+    else:
+        main(*map(int, sys.argv[1:]))
@@ -0,0 +1,175 @@
+"""Record the game trees explored by AlphaBetaPlayer to compact binary files
+and analyze them offline.
+
+Pass a `TraceWriter` as the `trace` option of an AlphaBetaPlayer to record
+every node the search visits:
+
+    with TraceWriter("move.trace") as trace:
+        player = AlphaBetaPlayer(score_fn=improved_score, trace=trace)
+        player.get_move(game, time_left)
+
+Each node is written when the search returns from it, so the records are in
+post-order: the children of a node directly precede it. Nodes interrupted by
+the search timeout are not recorded, except for the root, which is written
+with the ABORTED flag. The reader streams
+the records and keeps only the open nodes of the current path, so traces of
+millions of nodes can be analyzed without loading them into memory.
+
+    python search_trace.py move.trace
+"""
+import struct
+import sys
+
+from collections import namedtuple
+
+MAGIC = b"ISOTRACE\x01"
+
+# row, column, remaining depth, ply, flags, alpha, beta, score
+RECORD = struct.Struct("<bbBBBddd")
+
+CUTOFF = 1  # the score fell outside the (alpha, beta) window
+MAXIMIZING = 2  # the node was searched by maximize()
+ROOT = 4  # the root of an iteration; the move is the best move found
+ABORTED = 8  # a root whose search timed out; its score is NaN
+
+TraceNode = namedtuple("TraceNode", ["move", "depth", "ply", "alpha", "beta",
+                                     "score", "flags"])
+
+
+class TraceWriter:
+    """Buffered writer of search trace records.
+
+    Parameters
+    ----------
+    path : str
+        The name of the trace file; an existing file is overwritten.
+
+    buffer_size : int (optional)
+        The number of bytes collected in memory before they are written to
+        the file.
+    """
+
+    def __init__(self, path, buffer_size=2**20):
+        self.buffer_size = buffer_size
+        self.count = 0
+        self._file = open(path, "wb")
+        self._file.write(MAGIC)
+        self._buffer = bytearray()
+
+    def write_node(self, move, depth, ply, alpha, beta, score, flags):
+        """Record a node. move is the (row, column) pair of the move leading
+        to the node (of the best move for ROOT nodes), or None.
+        """
+        row, col = move if move is not None and move != (-1, -1) else (-1, -1)
+        self._buffer += RECORD.pack(row, col, depth, ply, flags, alpha, beta, score)
+        self.count += 1
+        if len(self._buffer) >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        """Write the buffered records to the file. """
+        self._file.write(self._buffer)
+        self._buffer = bytearray()
+
+    def close(self):
+        """Flush the buffered records and close the file. """
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def read_trace(path, chunk_records=2**14):
+    """Yield the records of a trace file as TraceNode tuples, reading the
+    file in chunks of chunk_records records.
+    """
+    with open(path, "rb") as trace:
+        if trace.read(len(MAGIC)) != MAGIC:
+            raise ValueError("{} is not a search trace file".format(path))
+        size = RECORD.size
+        while True:
+            chunk = trace.read(size * chunk_records)
+            # ignore a partial record at the end of an interrupted trace
+            for offset in range(0, len(chunk) - size + 1, size):
+                row, col, depth, ply, flags, alpha, beta, score = \
+                    RECORD.unpack_from(chunk, offset)
+                move = None if row < 0 else (row, col)
+                yield TraceNode(move, depth, ply, alpha, beta, score, flags)
+            if len(chunk) < size * chunk_records:
+                return
+
+
+def iter_nodes(path):
+    """Rebuild the search trees of a trace file incrementally. Yield a tuple
+    (node, children) for every node, in the order the search finished them,
+    where children lists the TraceNode records of its children in the order
+    they were searched.
+
+    Only the children of the nodes on the current path are kept in memory.
+    The children of an ABORTED root are the root moves searched before the
+    timeout; the records of the unfinished nodes below them are dropped.
+    """
+    # pending[ply] holds the finished children of the open node at ply
+    pending = []
+    for node in read_trace(path):
+        while len(pending) <= node.ply + 1:
+            pending.append([])
+        children = pending[node.ply + 1]
+        pending[node.ply + 1] = []
+        if node.flags & ROOT:
+            pending = [[]]
+        else:
+            pending[node.ply].append(node)
+        yield node, children
+
+
+def summarize(path):
+    """Return a list with a summary dict for each iteration (root search)
+    recorded in a trace file, holding the search depth, the root window,
+    score and best move, the number of nodes, the number of nodes at each
+    ply, the number of cutoffs, the score of each root move, and whether
+    the iteration was aborted by the search timeout.
+    """
+    iterations = []
+    nodes = 0
+    cutoffs = 0
+    plies = {}
+    for node, children in iter_nodes(path):
+        nodes += 1
+        cutoffs += bool(node.flags & CUTOFF)
+        plies[node.ply] = plies.get(node.ply, 0) + 1
+        if node.flags & ROOT:
+            iterations.append({
+                "depth": node.depth, "alpha": node.alpha, "beta": node.beta,
+                "score": node.score, "move": node.move, "nodes": nodes,
+                "nodes_per_ply": [plies.get(ply, 0) for ply in range(max(plies) + 1)],
+                "cutoffs": cutoffs,
+                "root_moves": [(child.move, child.score) for child in children],
+                "aborted": bool(node.flags & ABORTED)})
+            nodes = 0
+            cutoffs = 0
+            plies = {}
+    return iterations
+
+
+def main(path):
+    """Print a summary of every iteration recorded in a trace file. """
+    for idx, summary in enumerate(summarize(path)):
+        print("Iteration {}: depth {}, window ({}, {}), {}".format(
+            idx + 1, summary["depth"], summary["alpha"], summary["beta"],
+            "aborted" if summary["aborted"] else "score {}, best move {}".format(
+                summary["score"], summary["move"])))
+        print("  nodes: {} ({} cutoffs); per ply: {}".format(
+            summary["nodes"], summary["cutoffs"],
+            " ".join(map(str, summary["nodes_per_ply"]))))
+        print("  root moves: " + ", ".join(
+            "{}: {}".format(move, score) for move, score in summary["root_moves"]))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1])
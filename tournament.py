@@ -11,7 +11,11 @@ players, and the players play each match twice -- once as the first player and
 once as the second player.  Randomizing the openings and switching the player
 order corrects for imbalances due to both starting position and initiative.
 """
+import argparse
 import itertools
+import json
+import math
+import os
 import random
 import warnings
 
@@ -20,10 +24,11 @@ from collections import namedtuple
 from isolation import Board
 from sample_players import (RandomPlayer, open_move_score,
                             improved_score, center_score)
-from game_agent import (MinimaxPlayer, AlphaBetaPlayer, custom_score,
-                        custom_score_2, custom_score_3)
+from game_agent import (MinimaxPlayer, AlphaBetaPlayer, MCTSPlayer, CachedScore,
+                        custom_score, custom_score_2, custom_score_3)
 
 NUM_MATCHES = 20  # number of matches against each opponent
+MAX_SPRT_MATCHES = 200  # maximum number of matches per opponent with --sprt
 TIME_LIMIT = 150  # number of milliseconds before timeout
 
 DESCRIPTION = """
@@ -31,89 +36,414 @@ This script evaluates the performance of the custom_score evaluation
 function against a baseline agent using alpha-beta search and iterative
 deepening (ID) called `AB_Improved`. The three `AB_Custom` agents use
 ID and alpha-beta search with the custom_score functions defined in
-game_agent.py.
+game_agent.py. The `MCTS` agent uses Monte Carlo Tree Search with random
+playouts.
 """
 
 Agent = namedtuple("Agent", ["player", "name"])
 
+# agents rebuilt by each pool worker, see _init_worker()
+_worker_agents = None
 
-def play_round(cpu_agent, test_agents, win_counts, num_matches):
-    """Compare the test agents to the cpu agent in "fair" matches.
+
+def random_opening(rng=random):
+    """Return a random first move and response chosen with the specified
+    random number generator.
+    """
+    game = Board(None, None)
+    opening = []
+    for _ in range(2):
+        opening.append(rng.choice(game.get_legal_moves()))
+        game.apply_move(opening[-1])
+    return opening
+
+
+def play_game(cpu_player, test_player, test_first, opening, seed=None,
+              collect_stats=False):
+    """Play one game between a cpu agent and a test agent from the specified
+    opening moves, and return its result as a dict with the keys "test_won",
+    "termination", "history" (the move history returned by `Board.play`) and
+    "move_times" (the number of milliseconds used by each move).
+
+    If seed is set, the board and every agent with an `rng` attribute get
+    their own random number generators seeded from it, so the game is
+    reproducible.
+
+    If collect_stats is set and the test agent supports it (see
+    `game_agent.AlphaBetaPlayer`), the result also holds the search
+    statistics of each of its moves under the key "stats".
+    """
+    # clearing the evaluation caches keeps the games independent of the
+    # order they are played in
+    for player in (cpu_player, test_player):
+        if hasattr(getattr(player, "score", None), "clear"):
+            player.score.clear()
+
+    collect_stats = collect_stats and hasattr(test_player, "collect_stats")
+    if collect_stats:
+        test_player.collect_stats = True
+        test_player.stats_history = []
+
+    board_rng = None
+    if seed is not None:
+        board_rng = random.Random("{}:board".format(seed))
+        for role, player in (("cpu", cpu_player), ("test", test_player)):
+            if hasattr(player, "rng"):
+                player.rng = random.Random("{}:{}".format(seed, role))
+    if test_first:
+        game = Board(test_player, cpu_player, rng=board_rng)
+    else:
+        game = Board(cpu_player, test_player, rng=board_rng)
+    for move in opening:
+        game.apply_move(move)
+    winner, history, termination = game.play(time_limit=TIME_LIMIT)
+    result = {"test_won": winner == test_player, "termination": termination,
+              "history": history, "move_times": game.move_times}
+    if collect_stats:
+        result["stats"] = [stats.as_dict() for stats in test_player.stats_history]
+    return result
+
+
+def round_games(cpu_name, test_names, matches, openings, seed=None):
+    """Return the games of one round in "fair" matches against a cpu agent.
 
     "Fair" matches use random starting locations and force the agents to
     play as both first and second player to control for advantages resulting
     from choosing better opening moves or having first initiative to move.
+    The matches are numbered by the matches argument. All the games of a
+    match start from the same opening; openings already used by a match
+    (keyed by (cpu_name, match)) are reused.
+
+    If seed is set, the openings and the per-game seeds (see play_game) are
+    derived from it and from the names of the agents and the match number,
+    so every game can be replayed on its own.
+    """
+    games = []
+    for match in matches:
+        opening = openings.get((cpu_name, match))
+        if opening is None:
+            rng = random
+            if seed is not None:
+                rng = random.Random("{}:{}:{}".format(seed, cpu_name, match))
+            opening = openings[(cpu_name, match)] = random_opening(rng)
+        for test_name in test_names:
+            for test_first in (False, True):
+                game_seed = None
+                if seed is not None:
+                    game_seed = "{}:{}:{}:{}:{}".format(
+                        seed, cpu_name, test_name, match, int(test_first))
+                games.append({"cpu": cpu_name, "test": test_name,
+                              "match": match, "test_first": test_first,
+                              "opening": opening, "seed": game_seed})
+    return games
+
+
+def game_key(game):
+    """Return the key identifying a game (or the record of a game) in the
+    results log.
     """
-    timeout_count = 0
-    forfeit_count = 0
-    for _ in range(num_matches):
+    return game["cpu"], game["test"], game["match"], game["test_first"]
 
-        games = sum([[Board(cpu_agent.player, agent.player),
-                      Board(agent.player, cpu_agent.player)]
-                    for agent in test_agents], [])
 
-        # initialize all games with a random move and response
-        for _ in range(2):
-            move = random.choice(games[0].get_legal_moves())
+def read_log(path):
+    """Return the game records stored in a results log, skipping a partial
+    last line left by an interrupted run.
+    """
+    records = []
+    if not os.path.exists(path):
+        return records
+    with open(path) as log:
+        for line in log:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                pass
+    return records
+
+
+def physical_cpus():
+    """Return the ids of the logical CPUs available to this process, keeping
+    one per physical core (hyperthread siblings share a core, which would
+    make per-move timing unfair).
+    """
+    if hasattr(os, "sched_getaffinity"):
+        available = sorted(os.sched_getaffinity(0))
+    else:
+        available = list(range(os.cpu_count() or 1))
+
+    cores = {}
+    try:
+        with open("/proc/cpuinfo") as cpuinfo:
+            info = {}
+            for line in itertools.chain(cpuinfo, [""]):
+                if line.strip():
+                    key, _, value = line.partition(":")
+                    info[key.strip()] = value.strip()
+                elif "processor" in info:
+                    cpu = int(info["processor"])
+                    core = (info.get("physical id"), info.get("core id", cpu))
+                    if cpu in available:
+                        cores.setdefault(core, cpu)
+                    info = {}
+    except (OSError, ValueError):
+        return available
+    return sorted(cores.values()) or available
+
+
+def _init_worker(cpus, counter):
+    """Pin the pool worker to its own CPU and build its copy of the agents. """
+    global _worker_agents
+    with counter.get_lock():
+        worker_id = counter.value
+        counter.value += 1
+    if hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, {cpus[worker_id % len(cpus)]})
+    _worker_agents = ({agent.name: agent.player for agent in make_cpu_agents()},
+                      {agent.name: agent.player for agent in make_test_agents()})
+
+
+def _play_game(game, collect_stats):
+    """Play a game with the worker's copies of the agents (see play_game). """
+    cpu_players, test_players = _worker_agents
+    return play_game(cpu_players[game["cpu"]], test_players[game["test"]],
+                     game["test_first"], game["opening"], game["seed"],
+                     collect_stats)
+
+
+def play_rounds(cpu_agents, test_agents, num_matches, records, save,
+                processes=1, sprt=None, seed=None, collect_stats=False):
+    """Play every round of the tournament, skipping the games that already
+    have a record, and yield the name of each cpu agent once all the games
+    of its round are recorded. Every finished game is passed to save() as
+    soon as it completes.
+
+    If processes is greater than one, the games are played on a pool of
+    worker processes, each pinned to a separate physical core. The workers
+    build their own agents with make_cpu_agents() and make_test_agents().
+
+    If sprt is set, the matches of a round are played one at a time, and a
+    test agent stops playing against the cpu agent as soon as the SPRT
+    accepts a hypothesis; num_matches is then the maximum number of
+    matches.
+
+    If seed is set, every game is played with random number generators
+    derived from it (see round_games). If collect_stats is set, the results
+    include the search statistics of the test agents (see play_game).
+    """
+    done = {game_key(record) for record in records}
+    openings = {(record["cpu"], record["match"]): record["opening"]
+                for record in records}
+    test_names = [agent.name for agent in test_agents]
+    test_players = {agent.name: agent.player for agent in test_agents}
+
+    pool = None
+    if processes > 1:
+        import multiprocessing
+
+        cpus = physical_cpus()
+        counter = multiprocessing.Value("i", 0)
+        pool = multiprocessing.Pool(processes, _init_worker, (cpus, counter))
+
+    def start(agent, names, matches):
+        """Start the games of the specified matches between the cpu agent and
+        the named test agents. Return the pending pool results, or play the
+        games before returning if there is no pool.
+        """
+        games = [game for game in round_games(agent.name, names, matches,
+                                              openings, seed)
+                 if game_key(game) not in done]
+        if pool is None:
             for game in games:
-                game.apply_move(move)
-
-        # play all games and tally the results
-        for game in games:
-            winner, _, termination = game.play(time_limit=TIME_LIMIT)
-            win_counts[winner] += 1
-
-            if termination == "timeout":
-                timeout_count += 1
-            elif termination == "forfeit":
-                forfeit_count += 1
-
-    return timeout_count, forfeit_count
-
-
-def update(total_wins, wins):
-    for player in total_wins:
-        total_wins[player] += wins[player]
-    return total_wins
-
-
-def play_matches(cpu_agents, test_agents, num_matches):
-    """Play matches between the test agent and each cpu_agent individually. """
-    total_wins = {agent.player: 0 for agent in test_agents}
-    total_timeouts = 0.
-    total_forfeits = 0.
-    total_matches = 2 * num_matches * len(cpu_agents)
-
-    print("\n{:^9}{:^13}".format("Match #", "Opponent") + ''.join(['{:^13}'.format(x[1].name) for x in enumerate(test_agents)]))
-    print("{:^9}{:^13} ".format("", "") +  ' '.join(['{:^5}| {:^5}'.format("Won", "Lost") for x in enumerate(test_agents)]))
-
-    for idx, agent in enumerate(cpu_agents):
-        wins = {key: 0 for (key, value) in test_agents}
-        wins[agent.player] = 0
-
-        print("{!s:^9}{:^13}".format(idx + 1, agent.name), end="", flush=True)
-
-        counts = play_round(agent, test_agents, wins, num_matches)
-        total_timeouts += counts[0]
-        total_forfeits += counts[1]
-        total_wins = update(total_wins, wins)
-        _total = 2 * num_matches
-        round_totals = sum([[wins[agent.player], _total - wins[agent.player]]
-                            for agent in test_agents], [])
-        print(' ' + ' '.join([
-            '{:^5}| {:^5}'.format(
-                round_totals[i],round_totals[i+1]
-            ) for i in range(0, len(round_totals), 2)
-        ]))
+                result = play_game(agent.player, test_players[game["test"]],
+                                   game["test_first"], game["opening"],
+                                   game["seed"], collect_stats)
+                save(dict(game, **result))
+            return []
+        # the callbacks run in a single result-handler thread, so the
+        # records are saved one at a time and as soon as each game ends
+        return [pool.apply_async(_play_game, (game, collect_stats), callback=(
+                    lambda result, game=game: save(dict(game, **result))))
+                for game in games]
+
+    try:
+        if sprt is None:
+            # queue every game at once so that the pool never idles
+            pending = None
+            if pool is not None:
+                pending = [start(agent, test_names, range(num_matches))
+                           for agent in cpu_agents]
+            for idx, agent in enumerate(cpu_agents):
+                results = (pending[idx] if pending is not None else
+                           start(agent, test_names, range(num_matches)))
+                for result in results:
+                    result.get()
+                yield agent.name
+        else:
+            for agent in cpu_agents:
+                for match in range(num_matches):
+                    names = [name for name in test_names
+                             if sprt.status(*score(records, agent.name, name)) is None]
+                    if not names:
+                        break
+                    for result in start(agent, names, [match]):
+                        result.get()
+                yield agent.name
+    finally:
+        if pool is not None:
+            pool.terminate()
+
+
+def score(records, cpu_name, test_name):
+    """Return the number of games won and lost by a test agent against a cpu
+    agent in a list of game records.
+    """
+    wins = losses = 0
+    for record in records:
+        if record["cpu"] == cpu_name and record["test"] == test_name:
+            if record["test_won"]:
+                wins += 1
+            else:
+                losses += 1
+    return wins, losses
+
+
+def expected_score(elo):
+    """Return the expected score of a player rated elo points above its
+    opponent.
+    """
+    return 1 / (1 + 10 ** (-elo / 400))
 
-    print("-" * 74)
-    print('{:^9}{:^13}'.format("", "Win Rate:") +
-        ''.join([
-            '{:^13}'.format(
-                "{:.1f}%".format(100 * total_wins[x[1].player] / total_matches)
-            ) for x in enumerate(test_agents)
+
+def elo_difference(score):
+    """Return the Elo difference corresponding to an expected score. """
+    if score <= 0:
+        return float("-inf")
+    if score >= 1:
+        return float("inf")
+    return 400 * math.log10(score / (1 - score))
+
+
+def elo_interval(wins, losses, z=1.96):
+    """Return the Elo difference estimated from the number of games won and
+    lost, and the bounds of its confidence interval (95% for z = 1.96),
+    computed with the Wilson score interval so that they stay finite when
+    every game was won or lost.
+    """
+    games = wins + losses
+    if not games:
+        return 0., float("-inf"), float("inf")
+    score = wins / games
+    center = (score + z * z / (2 * games)) / (1 + z * z / games)
+    margin = (z * math.sqrt(score * (1 - score) / games + z * z / (4 * games * games)) /
+              (1 + z * z / games))
+    low = elo_difference(center - margin) if wins else float("-inf")
+    high = elo_difference(center + margin) if losses else float("inf")
+    return elo_difference(score), low, high
+
+
+class SPRT:
+    """Sequential probability ratio test of the Elo difference between a test
+    agent and a cpu agent. Isolation games cannot be drawn, so each game is
+    a Bernoulli trial, and the test compares the hypotheses H0: elo = elo0
+    and H1: elo = elo1.
+
+    Parameters
+    ----------
+    elo0, elo1 : float
+        The Elo differences of the null and alternative hypotheses.
+
+    alpha, beta : float
+        The maximum probabilities of accepting H1 when H0 holds and of
+        accepting H0 when H1 holds.
+    """
+
+    def __init__(self, elo0=0., elo1=50., alpha=0.05, beta=0.05):
+        self.elo0 = elo0
+        self.elo1 = elo1
+        self.alpha = alpha
+        self.beta = beta
+        p0 = expected_score(elo0)
+        p1 = expected_score(elo1)
+        self._win_llr = math.log(p1 / p0)
+        self._loss_llr = math.log((1 - p1) / (1 - p0))
+        self.lower = math.log(beta / (1 - alpha))
+        self.upper = math.log((1 - beta) / alpha)
+
+    def llr(self, wins, losses):
+        """Return the log-likelihood ratio of H1 to H0. """
+        return wins * self._win_llr + losses * self._loss_llr
+
+    def status(self, wins, losses):
+        """Return "H1" or "H0" if the test accepts that hypothesis, or None
+        if more games are needed.
+        """
+        llr = self.llr(wins, losses)
+        if llr >= self.upper:
+            return "H1"
+        if llr <= self.lower:
+            return "H0"
+        return None
+
+
+def tally(records):
+    """Count the results in a list of game records. Return a tuple (wins,
+    games, timeouts, forfeits), where wins and games map (cpu agent name,
+    test agent name) pairs to the number of games won by the test agent and
+    the number of games played.
+    """
+    wins = {}
+    games = {}
+    timeouts = 0
+    forfeits = 0
+    for record in records:
+        key = (record["cpu"], record["test"])
+        wins[key] = wins.get(key, 0) + record["test_won"]
+        games[key] = games.get(key, 0) + 1
+        if record["termination"] == "timeout":
+            timeouts += 1
+        elif record["termination"] == "forfeit":
+            forfeits += 1
+    return wins, games, timeouts, forfeits
+
+
+def print_header(test_names):
+    print("\n{:^9}{:^13}".format("Match #", "Opponent") + ''.join(['{:^13}'.format(name) for name in test_names]))
+    print("{:^9}{:^13} ".format("", "") +  ' '.join(['{:^5}| {:^5}'.format("Won", "Lost") for _ in test_names]))
+
+
+def print_row(idx, cpu_name, test_names, records):
+    wins, games, _, _ = tally(records)
+    print("{!s:^9}{:^13}".format(idx + 1, cpu_name), end="")
+    round_totals = sum([[wins.get((cpu_name, name), 0),
+                         games.get((cpu_name, name), 0) - wins.get((cpu_name, name), 0)]
+                        for name in test_names], [])
+    print(' ' + ' '.join([
+        '{:^5}| {:^5}'.format(
+            round_totals[i],round_totals[i+1]
+        ) for i in range(0, len(round_totals), 2)
     ]))
 
+
+def print_footer(test_names, records, sprt=None):
+    wins, games, total_timeouts, total_forfeits = tally(records)
+    total_wins = {name: 0 for name in test_names}
+    total_matches = {name: 0 for name in test_names}
+    for (cpu_name, test_name), count in games.items():
+        if test_name in total_matches:
+            total_wins[test_name] += wins[(cpu_name, test_name)]
+            total_matches[test_name] += count
+
+    print("-" * 74)
+    if sprt is None:
+        print('{:^9}{:^13}'.format("", "Win Rate:") +
+            ''.join([
+                '{:^13}'.format(
+                    "{:.1f}%".format(100 * total_wins[name] / max(total_matches[name], 1))
+                ) for name in test_names
+        ]))
+    else:
+        print_elo(test_names, records, sprt)
+
     if total_timeouts:
         print(("\nThere were {} timeouts during the tournament -- make sure " +
                "your agent handles search timeout correctly, and consider " +
@@ -124,19 +454,139 @@ def play_matches(cpu_agents, test_agents, num_matches):
                "legal moves available to play.\n").format(total_forfeits))
 
 
-def main():
-
-    # Define two agents to compare -- these agents will play from the same
-    # starting position against the same adversaries in the tournament
-    test_agents = [
-        Agent(AlphaBetaPlayer(score_fn=improved_score), "AB_Improved"),
-        Agent(AlphaBetaPlayer(score_fn=custom_score), "AB_Custom"),
-        Agent(AlphaBetaPlayer(score_fn=custom_score_2), "AB_Custom_2"),
-        Agent(AlphaBetaPlayer(score_fn=custom_score_3), "AB_Custom_3")
+def print_elo(test_names, records, sprt):
+    """Print the Elo difference of each test agent against all the cpu agents
+    and against each of them, with 95% confidence intervals and the result
+    of the SPRT.
+    """
+    overall = []
+    for name in test_names:
+        results = [record["test_won"] for record in records
+                   if record["test"] == name]
+        wins = sum(results)
+        overall.append(elo_interval(wins, len(results) - wins)[0])
+    print('{:^9}{:^13}'.format("", "Elo:") +
+          ''.join(['{:^13}'.format("{:+.0f}".format(elo)) for elo in overall]))
+
+    print("\nElo difference (95% CI) of each test agent against each opponent;")
+    print("SPRT of H0: elo = {:+.0f} against H1: elo = {:+.0f} (alpha = {}, "
+          "beta = {})\n".format(sprt.elo0, sprt.elo1, sprt.alpha, sprt.beta))
+    cpu_names = []
+    for record in records:
+        if record["cpu"] not in cpu_names:
+            cpu_names.append(record["cpu"])
+    for test_name in test_names:
+        for cpu_name in cpu_names:
+            wins, losses = score(records, cpu_name, test_name)
+            if not wins + losses:
+                continue
+            print("{:>13} vs {:<13}{:>22}{:>6} games   {}".format(
+                test_name, cpu_name,
+                "{:+.0f} [{:+.0f}, {:+.0f}]".format(*elo_interval(wins, losses)),
+                wins + losses,
+                sprt.status(wins, losses) or "undecided"))
+
+
+def print_summary(records, sprt=None):
+    """Print the results table of the tournament recorded in a results log,
+    without replaying any game.
+    """
+    cpu_names = []
+    test_names = []
+    for record in records:
+        if record["cpu"] not in cpu_names:
+            cpu_names.append(record["cpu"])
+        if record["test"] not in test_names:
+            test_names.append(record["test"])
+
+    print_header(test_names)
+    for idx, cpu_name in enumerate(cpu_names):
+        print_row(idx, cpu_name, test_names, records)
+    print_footer(test_names, records, sprt)
+
+
+def play_matches(cpu_agents, test_agents, num_matches, processes=1,
+                 log_path=None, sprt=None, seed=None, stats_path=None):
+    """Play matches between the test agent and each cpu_agent individually.
+    If processes is greater than one, the games are played on a process pool
+    (see play_rounds).
+
+    If log_path is set, every finished game is appended to that file as a
+    JSON record as soon as it completes, and the games already recorded in
+    the file are not played again, so an interrupted tournament can be
+    resumed. The records hold the agent names, the match number, which
+    agent moved first, the opening moves, whether the test agent won, the
+    termination reason, the move history and the time used by each move.
+
+    If sprt is set, each pairing stops as soon as the SPRT is decided (up to
+    num_matches matches), and the results are reported as Elo differences.
+
+    If seed is set, the openings and the random choices of the boards and
+    agents are derived from it, and each record holds the seed of its game.
+
+    If stats_path is set, the search statistics of every move of the test
+    agents (see `game_agent.SearchStats`) are appended to that file as JSON
+    lines, together with the names of the agents, the match number, which
+    agent moved first and the index of the move.
+    """
+    records = []
+    log = None
+    if log_path is not None:
+        records = read_log(log_path)
+        log = open(log_path, "a")
+    stats_log = None
+    if stats_path is not None:
+        stats_log = open(stats_path, "a")
+
+    def save(record):
+        move_stats = record.pop("stats", [])
+        records.append(record)
+        if log is not None:
+            log.write(json.dumps(record) + "\n")
+            log.flush()
+        if stats_log is not None:
+            for idx, stats in enumerate(move_stats):
+                stats.update(cpu=record["cpu"], test=record["test"],
+                             match=record["match"],
+                             test_first=record["test_first"], move=idx)
+                stats_log.write(json.dumps(stats) + "\n")
+            stats_log.flush()
+
+    test_names = [agent.name for agent in test_agents]
+    print_header(test_names)
+    try:
+        rounds = play_rounds(cpu_agents, test_agents, num_matches, records,
+                             save, processes, sprt, seed,
+                             stats_path is not None)
+        for idx, cpu_name in enumerate(rounds):
+            print_row(idx, cpu_name, test_names,
+                      [record for record in records if record["cpu"] == cpu_name])
+    finally:
+        if log is not None:
+            log.close()
+        if stats_log is not None:
+            stats_log.close()
+
+    cpu_names = {agent.name for agent in cpu_agents}
+    print_footer(test_names, [record for record in records
+                              if record["cpu"] in cpu_names and
+                              record["test"] in test_names], sprt)
+
+
+def make_test_agents():
+    """Return the agents evaluated by the tournament. """
+    return [
+        Agent(AlphaBetaPlayer(score_fn=CachedScore(improved_score)), "AB_Improved"),
+        Agent(AlphaBetaPlayer(score_fn=CachedScore(custom_score)), "AB_Custom"),
+        Agent(AlphaBetaPlayer(score_fn=CachedScore(custom_score_2)), "AB_Custom_2"),
+        Agent(AlphaBetaPlayer(score_fn=CachedScore(custom_score_3)), "AB_Custom_3"),
+        Agent(MCTSPlayer(), "MCTS")
     ]
 
-    # Define a collection of agents to compete against the test agents
-    cpu_agents = [
+
+def make_cpu_agents():
+    """Return the collection of agents the test agents compete against. """
+    return [
         Agent(RandomPlayer(), "Random"),
         Agent(MinimaxPlayer(score_fn=open_move_score), "MM_Open"),
         Agent(MinimaxPlayer(score_fn=center_score), "MM_Center"),
@@ -146,11 +596,81 @@ def main():
         Agent(AlphaBetaPlayer(score_fn=improved_score), "AB_Improved")
     ]
 
+
+def main():
+    parser = argparse.ArgumentParser(description=DESCRIPTION)
+    parser.add_argument("-p", "--processes", type=int, default=1,
+                        help="number of games played in parallel, at most "
+                             "one per physical core (default: 1)")
+    parser.add_argument("-l", "--log",
+                        help="append every finished game to this results "
+                             "file, and skip the games already recorded in it")
+    parser.add_argument("-s", "--summary", action="store_true",
+                        help="print the results table of the --log file "
+                             "without playing any game")
+    parser.add_argument("--sprt", action="store_true",
+                        help="stop each pairing once an SPRT of the Elo "
+                             "difference is decided, and report Elo "
+                             "differences instead of win rates")
+    parser.add_argument("--elo0", type=float, default=0.,
+                        help="Elo difference of the SPRT null hypothesis "
+                             "(default: 0)")
+    parser.add_argument("--elo1", type=float, default=50.,
+                        help="Elo difference of the SPRT alternative "
+                             "hypothesis (default: 50)")
+    parser.add_argument("--alpha", type=float, default=0.05,
+                        help="SPRT false positive rate (default: 0.05)")
+    parser.add_argument("--beta", type=float, default=0.05,
+                        help="SPRT false negative rate (default: 0.05)")
+    parser.add_argument("-n", "--matches", type=int,
+                        help="number of matches against each opponent, or "
+                             "the maximum number with --sprt (default: {}, "
+                             "or {} with --sprt)".format(NUM_MATCHES,
+                                                        MAX_SPRT_MATCHES))
+    parser.add_argument("--seed", type=int,
+                        help="master seed of the openings and of the random "
+                             "choices of the boards and agents")
+    parser.add_argument("--stats",
+                        help="append the search statistics of every move of "
+                             "the test agents to this file as JSON lines")
+    args = parser.parse_args()
+
+    sprt = None
+    num_matches = args.matches or NUM_MATCHES
+    if args.sprt:
+        sprt = SPRT(args.elo0, args.elo1, args.alpha, args.beta)
+        num_matches = args.matches or MAX_SPRT_MATCHES
+
+    if args.summary:
+        if args.log is None:
+            parser.error("--summary requires --log")
+        print_summary(read_log(args.log), sprt)
+        return
+
+    processes = args.processes
+    if processes > 1 and processes > len(physical_cpus()):
+        processes = len(physical_cpus())
+        warnings.warn("Only {} physical cores are available; playing {} "
+                      "games in parallel.".format(processes, processes))
+
+    # Define two agents to compare -- these agents will play from the same
+    # starting position against the same adversaries in the tournament
+    test_agents = make_test_agents()
+
+    # Define a collection of agents to compete against the test agents
+    cpu_agents = make_cpu_agents()
+
     print(DESCRIPTION)
     print("{:^74}".format("*************************"))
     print("{:^74}".format("Playing Matches"))
     print("{:^74}".format("*************************"))
-    play_matches(cpu_agents, test_agents, NUM_MATCHES)
+    play_matches(cpu_agents, test_agents, num_matches, processes, args.log,
+                 sprt, args.seed, args.stats)
+
+    for agent in test_agents:
+        if isinstance(agent.player, MCTSPlayer) and agent.player.total_time:
+            print("{} playout rate: {:.0f} playouts/sec".format(
+                agent.name, agent.player.total_playouts / agent.player.total_time))
 
 
 if __name__ == "__main__":